@@ -1,3 +1,32 @@
 from django.contrib import admin
+from .models import Entry, Link, Revision
 
 # Register your models here.
+
+
+class EntryAdmin(admin.ModelAdmin):
+    list_display = ('title', 'updated_at')
+    search_fields = ('title',)
+    readonly_fields = ('folded_title', 'updated_at')
+    ordering = ('title',)
+
+
+class RevisionAdmin(admin.ModelAdmin):
+    list_display = ('title', 'number', 'is_snapshot', 'size', 'created_at')
+    list_filter = ('is_snapshot', 'created_at')
+    search_fields = ('title',)
+    exclude = ('data',)
+    readonly_fields = ('title', 'number', 'is_snapshot', 'size', 'created_at')
+    ordering = ('title', '-number')
+
+
+class LinkAdmin(admin.ModelAdmin):
+    list_display = ('source', 'target')
+    search_fields = ('source', 'target')
+    readonly_fields = ('folded_target',)
+    ordering = ('source', 'target')
+
+
+admin.site.register(Entry, EntryAdmin)
+admin.site.register(Revision, RevisionAdmin)
+admin.site.register(Link, LinkAdmin)
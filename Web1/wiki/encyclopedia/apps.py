@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class EncyclopediaConfig(AppConfig):
     name = 'encyclopedia'
+
+    def ready(self):
+        # Connect the entry_saved receivers
+        from . import links, revisions, search  # noqa: F401
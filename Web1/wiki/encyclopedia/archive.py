@@ -0,0 +1,135 @@
+import io
+import json
+import os
+import re
+import sys
+import tarfile
+import time
+
+
+# Streaming readers and writers for wiki_import and wiki_export. Archives
+# are either JSONL, one {"title": ..., "content": ...} object per line, or
+# tar files holding one <title>.md member per entry.
+
+FORMATS = ("jsonl", "tar")
+
+
+def guess_format(path):
+    """
+    Returns the archive format implied by a file name.
+    """
+    name = path.lower()
+    if name.endswith((".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")):
+        return "tar"
+    return "jsonl"
+
+
+def valid_title(title):
+    """
+    Returns True if title can be stored as entries/<title>.md.
+    """
+    return (isinstance(title, str) and bool(title)
+            and "/" not in title and "\\" not in title and not title.startswith("."))
+
+
+def _malformed(location, reason):
+    raise ValueError(f"{location}: {reason}")
+
+
+def read_entries(path, fmt, on_malformed=_malformed):
+    """
+    Yields (title, content) pairs from an archive one at a time, so
+    the archive is never held in memory as a whole. A path of "-"
+    reads from standard input. Records that cannot be read are passed
+    to on_malformed(location, reason) and skipped; by default it raises
+    ValueError.
+    """
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        if fmt == "tar":
+            with tarfile.open(fileobj=stream, mode="r|*") as archive:
+                for member in archive:
+                    if not member.isfile() or not member.name.endswith(".md"):
+                        continue
+                    title = re.sub(r"\.md$", "", os.path.basename(member.name))
+                    try:
+                        content = archive.extractfile(member).read().decode("utf-8")
+                    except UnicodeDecodeError as e:
+                        on_malformed(member.name, f"not UTF-8 ({e.reason})")
+                        continue
+                    yield title, content
+        else:
+            for number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError as e:
+                    on_malformed(f"line {number}", f"invalid JSON ({e})")
+                    continue
+                if not isinstance(record, dict) or not isinstance(record.get("content"), str):
+                    on_malformed(f"line {number}", 'expected an object with a string "content"')
+                    continue
+                yield record.get("title"), record["content"]
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+
+class EntryWriter:
+    """
+    Writes entries to an archive as they are produced. A path of "-"
+    writes to standard output.
+    """
+
+    def __init__(self, path, fmt):
+        self.fmt = fmt
+        self.stream = sys.stdout.buffer if path == "-" else open(path, "wb")
+        if fmt == "tar":
+            mode = "w|gz" if path.lower().endswith((".gz", ".tgz")) else "w|"
+            self.archive = tarfile.open(fileobj=self.stream, mode=mode)
+
+    def write(self, title, content):
+        data = content.encode("utf-8")
+        if self.fmt == "tar":
+            info = tarfile.TarInfo(f"{title}.md")
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self.archive.addfile(info, io.BytesIO(data))
+        else:
+            self.stream.write(json.dumps({"title": title, "content": content}).encode("utf-8") + b"\n")
+
+    def close(self):
+        if self.fmt == "tar":
+            self.archive.close()
+        if self.stream is not sys.stdout.buffer:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Throughput:
+    """
+    Counts processed entries and reports entries per second.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.start = time.perf_counter()
+
+    def add(self, count=1):
+        self.count += count
+
+    @property
+    def rate(self):
+        elapsed = time.perf_counter() - self.start
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        return f"{self.count} entries in {time.perf_counter() - self.start:.2f}s ({self.rate:.0f} entries/s)"
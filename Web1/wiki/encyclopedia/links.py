@@ -0,0 +1,103 @@
+import re
+from urllib.parse import unquote
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.dispatch import receiver
+
+from . import store, util
+from .models import Entry, Link
+from .signals import entry_saved
+
+
+# Inline links [text](/wiki/Title/) and reference definitions
+# [label]: /wiki/Title/, optionally with a scheme and host
+_link_re = re.compile(
+    r"(?:\]\(\s*<?|^[ \t]*\[[^\]\n]+\]:[ \t]*<?)"
+    r"(?:https?://[^/\s)>]+)?/wiki/([^/\s)>#?]+)",
+    re.MULTILINE
+)
+
+
+def extract_links(content):
+    """
+    Returns the set of entry titles that Markdown content links to.
+    """
+    return {unquote(match) for match in _link_re.findall(content)}
+
+
+def _link_rows(source, targets, exists):
+    return [Link(source=source, target=target, folded_target=target.casefold(),
+                 resolved=exists(target))
+            for target in targets if target != source]
+
+
+def update_links(title, content):
+    """
+    Replaces the stored outgoing links of an entry with those in its
+    content, and marks links to the entry from elsewhere as resolved.
+    """
+    rows = _link_rows(title, extract_links(content), lambda target: util.find_entry(target) is not None)
+    with store.write_lock, transaction.atomic():
+        Link.objects.filter(source=title).delete()
+        Link.objects.bulk_create(rows)
+        Link.objects.filter(folded_target=title.casefold(), resolved=False).update(resolved=True)
+
+
+def rebuild_links(batch_size=1000):
+    """
+    Re-extracts the links of every entry. Returns the number of links
+    stored.
+    """
+    count = 0
+    titles = util.list_entries()
+    folded = {title.casefold() for title in titles}
+    with store.write_lock, transaction.atomic():
+        Link.objects.all().delete()
+        rows = []
+        for title in titles:
+            content = util.get_entry(title)
+            if content is not None:
+                rows.extend(_link_rows(title, extract_links(content),
+                                       lambda target: target.casefold() in folded))
+            if len(rows) >= batch_size:
+                Link.objects.bulk_create(rows)
+                count += len(rows)
+                rows = []
+        Link.objects.bulk_create(rows)
+    return count + len(rows)
+
+
+def outgoing_links(title):
+    """
+    Returns the titles an entry links to, in alphabetical order.
+    """
+    return list(Link.objects.filter(source=title).order_by("target").values_list("target", flat=True))
+
+
+def backlinks(title):
+    """
+    Returns the titles of entries linking to the given entry,
+    matching the link target case-insensitively.
+    """
+    return list(Link.objects.filter(folded_target=title.casefold())
+                .order_by("source").values_list("source", flat=True).distinct())
+
+
+def broken_links():
+    """
+    Returns (source, target) pairs for links whose target entry does
+    not exist, ordered by target. With the database backend the targets
+    are resolved against Entry in the same query; with files, the
+    resolved flag maintained on each save answers it.
+    """
+    if util.database_backend():
+        links = Link.objects.filter(~Exists(Entry.objects.filter(folded_title=OuterRef("folded_target"))))
+    else:
+        links = Link.objects.filter(resolved=False)
+    return list(links.order_by("target", "source").values_list("source", "target"))
+
+
+@receiver(entry_saved)
+def update_saved_entry_links(sender, title, content, **kwargs):
+    update_links(title, content)
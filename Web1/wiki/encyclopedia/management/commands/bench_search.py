@@ -0,0 +1,75 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from encyclopedia import search, util, views
+
+
+class Command(BaseCommand):
+    help = ("Benchmark search on a synthetic corpus of titles and bodies, timing "
+            "the index lookups alone and the whole view including rendering.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--entries", type=int, default=100000,
+                            help="Number of synthetic entries to index.")
+        parser.add_argument("--queries", type=int, default=5000,
+                            help="Number of search requests to time.")
+        parser.add_argument("--target-ms", type=float, default=5.0,
+                            help="Fail if the lookups' p99 latency exceeds this many milliseconds.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if util.database_backend():
+            raise CommandError("bench_search measures the files backend's in-memory index.")
+        rng = random.Random(options["seed"])
+        words = sorted({
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+            for _ in range(20000)
+        })
+
+        # Swap a synthetic corpus in for the entries directory and its index
+        index = search.SearchIndex()
+        titles = set()
+        start = time.perf_counter()
+        while len(titles) < options["entries"]:
+            title = " ".join(rng.choices(words, k=rng.randint(1, 4))).title()
+            if title not in titles:
+                titles.add(title)
+                index.add(title, " ".join(rng.choices(words, k=rng.randint(20, 200))))
+        self.stdout.write(f"Indexed {len(titles)} entries in {time.perf_counter() - start:.1f}s")
+        with util._index_lock:
+            util._install_index(sorted(titles), util._entries_mtime())
+        saved_index, search._index = search._index, index
+
+        factory = RequestFactory()
+        lookups, requests = [], []
+        try:
+            for _ in range(options["queries"]):
+                # Word pairs and title prefixes that are not whole titles
+                query = (" ".join(rng.sample(words, 2)) if rng.random() < 0.5
+                         else rng.choice(words)[:rng.randint(2, 4)])
+                start = time.perf_counter()
+                views.search_matches(query)
+                lookups.append((time.perf_counter() - start) * 1000)
+
+                request = factory.get("/search/", {"q": query})
+                start = time.perf_counter()
+                views.search(request)
+                requests.append((time.perf_counter() - start) * 1000)
+        finally:
+            search._index = saved_index
+            util.invalidate_entries()
+
+        for label, timings in (("lookups", lookups), ("view", requests)):
+            timings.sort()
+            self.stdout.write(
+                f"{len(titles)} entries, {len(timings)} searches, {label}: "
+                f"p50 {timings[len(timings) // 2]:.3f} ms, "
+                f"p99 {timings[int(len(timings) * 0.99)]:.3f} ms, max {timings[-1]:.3f} ms"
+            )
+        p99 = lookups[int(len(lookups) * 0.99)]
+        if p99 > options["target_ms"]:
+            raise CommandError(f"lookup p99 latency {p99:.3f} ms exceeds {options['target_ms']} ms target")
@@ -0,0 +1,57 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from encyclopedia import util, views
+
+
+class Command(BaseCommand):
+    help = "Benchmark the title suggestion endpoint on a synthetic corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titles", type=int, default=200000,
+                            help="Number of synthetic titles to index.")
+        parser.add_argument("--queries", type=int, default=20000,
+                            help="Number of suggestion requests to time.")
+        parser.add_argument("--target-ms", type=float, default=2.0,
+                            help="Fail if p99 latency exceeds this many milliseconds.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        alphabet = string.ascii_letters + "  "
+        titles = sorted({
+            rng.choice(string.ascii_uppercase) +
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(4, 24))).strip()
+            for _ in range(options["titles"])
+        })
+
+        # Swap the synthetic corpus in for the entries directory
+        with util._index_lock:
+            util._install_index(titles, util._entries_mtime())
+
+        factory = RequestFactory()
+        timings = []
+        try:
+            for _ in range(options["queries"]):
+                title = rng.choice(titles)
+                prefix = title[:rng.randint(1, min(len(title), 6))]
+                request = factory.get("/search/suggest/", {"q": prefix})
+                start = time.perf_counter()
+                views.suggest(request)
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            util.invalidate_entries()
+
+        timings.sort()
+        p50 = timings[len(timings) // 2]
+        p99 = timings[int(len(timings) * 0.99)]
+        self.stdout.write(
+            f"{len(titles)} titles, {len(timings)} queries: "
+            f"p50 {p50:.3f} ms, p99 {p99:.3f} ms, max {timings[-1]:.3f} ms"
+        )
+        if p99 > options["target_ms"]:
+            raise CommandError(f"p99 latency {p99:.3f} ms exceeds {options['target_ms']} ms target")
@@ -0,0 +1,76 @@
+import queue
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from encyclopedia import archive, util
+
+
+class Command(BaseCommand):
+    help = "Import encyclopedia entries from a JSONL or tar archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='Archive to read, or "-" for standard input.')
+        parser.add_argument("--format", choices=archive.FORMATS,
+                            help="Archive format; guessed from the file name by default.")
+        parser.add_argument("--workers", type=int, default=4,
+                            help="Number of threads saving entries in parallel.")
+        parser.add_argument("--progress", type=int, default=10000,
+                            help="Report throughput every this many entries (0 to disable).")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or archive.guess_format(options["path"])
+        workers = max(1, options["workers"])
+
+        # A bounded queue keeps only a few entries in memory at a time
+        pending = queue.Queue(maxsize=workers * 4)
+        errors = []
+        throughput = archive.Throughput()
+        lock = threading.Lock()
+
+        def work():
+            try:
+                while True:
+                    item = pending.get()
+                    if item is None:
+                        return
+                    try:
+                        util.save_entry(*item)
+                    except Exception as e:
+                        errors.append((item[0], e))
+                        continue
+                    with lock:
+                        throughput.add()
+                        if options["progress"] and throughput.count % options["progress"] == 0:
+                            self.stdout.write(str(throughput))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        skipped = 0
+        malformed = []
+        try:
+            for title, content in archive.read_entries(options["path"], fmt,
+                                                       lambda *record: malformed.append(record)):
+                if not archive.valid_title(title):
+                    skipped += 1
+                    continue
+                pending.put((title, content))
+        finally:
+            for _ in threads:
+                pending.put(None)
+            for thread in threads:
+                thread.join()
+
+        for title, error in errors:
+            self.stderr.write(f"Could not save '{title}': {error}")
+        for location, reason in malformed:
+            self.stderr.write(f"Skipped malformed record at {location}: {reason}")
+        if skipped:
+            self.stderr.write(f"Skipped {skipped} entries with invalid titles.")
+        self.stdout.write(self.style.SUCCESS(f"Imported {throughput}"))
+        if errors:
+            raise CommandError(f"{len(errors)} entries failed to import.")
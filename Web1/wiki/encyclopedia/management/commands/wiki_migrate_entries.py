@@ -0,0 +1,32 @@
+import re
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from encyclopedia import store
+
+
+class Command(BaseCommand):
+    help = "Copy the Markdown files under entries/ into the database entry store."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Number of entries written per transaction.")
+
+    def handle(self, *args, **options):
+        _, filenames = default_storage.listdir("entries")
+        batch = []
+        count = 0
+        for filename in sorted(filenames):
+            if not filename.endswith(".md"):
+                continue
+            with default_storage.open(f"entries/{filename}") as f:
+                batch.append((re.sub(r"\.md$", "", filename), f.read().decode("utf-8")))
+            if len(batch) >= options["batch_size"]:
+                store.save_entries(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            store.save_entries(batch)
+            count += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Migrated {count} entries."))
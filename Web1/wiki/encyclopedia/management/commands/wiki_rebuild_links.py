@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from encyclopedia import links
+
+
+class Command(BaseCommand):
+    help = "Rebuild the link graph from the content of every encyclopedia entry."
+
+    def handle(self, *args, **options):
+        count = links.rebuild_links()
+        self.stdout.write(self.style.SUCCESS(f"Stored {count} links."))
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:35
+
+from django.db import migrations, models
+
+
+# Full-text index over encyclopedia_entry, kept in sync by triggers
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE entry_fts USING fts5(
+        title, content, content='encyclopedia_entry', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER entry_fts_insert AFTER INSERT ON encyclopedia_entry BEGIN
+        INSERT INTO entry_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER entry_fts_delete AFTER DELETE ON encyclopedia_entry BEGIN
+        INSERT INTO entry_fts(entry_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER entry_fts_update AFTER UPDATE ON encyclopedia_entry BEGIN
+        INSERT INTO entry_fts(entry_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO entry_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS entry_fts_update",
+    "DROP TRIGGER IF EXISTS entry_fts_delete",
+    "DROP TRIGGER IF EXISTS entry_fts_insert",
+    "DROP TABLE IF EXISTS entry_fts",
+]
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Entry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, unique=True)),
+                ('folded_title', models.CharField(db_index=True, max_length=255)),
+                ('content', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Entries',
+                'ordering': ['title'],
+            },
+        ),
+        migrations.RunSQL(CREATE_FTS, DROP_FTS),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('encyclopedia', '0002_revision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Link',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(db_index=True, max_length=255)),
+                ('target', models.CharField(max_length=255)),
+                ('folded_target', models.CharField(db_index=True, max_length=255)),
+            ],
+            options={
+                'unique_together': {('source', 'target')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:12
+
+from django.db import migrations, models
+
+
+def mark_resolved(apps, schema_editor):
+    """
+    Flags the existing links whose target entry exists.
+    """
+    from encyclopedia import util
+
+    Entry = apps.get_model("encyclopedia", "Entry")
+    Link = apps.get_model("encyclopedia", "Link")
+    if util.database_backend():
+        folded = set(Entry.objects.values_list("folded_title", flat=True))
+    else:
+        folded = {title.casefold() for title in util.list_entries()}
+    ids = [pk for pk, target in Link.objects.values_list("pk", "folded_target") if target in folded]
+    for start in range(0, len(ids), 500):
+        Link.objects.filter(pk__in=ids[start:start + 500]).update(resolved=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('encyclopedia', '0003_link'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='link',
+            name='resolved',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='link',
+            index=models.Index(fields=['resolved', 'target', 'source'], name='link_resolved_idx'),
+        ),
+        migrations.RunPython(mark_resolved, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+
+
+# Trigram index over entry titles for infix title search, kept in sync
+# by triggers like entry_fts
+CREATE_TITLE_FTS = [
+    """
+    CREATE VIRTUAL TABLE entry_title_fts USING fts5(
+        title, content='encyclopedia_entry', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER entry_title_fts_insert AFTER INSERT ON encyclopedia_entry BEGIN
+        INSERT INTO entry_title_fts(rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER entry_title_fts_delete AFTER DELETE ON encyclopedia_entry BEGIN
+        INSERT INTO entry_title_fts(entry_title_fts, rowid, title)
+        VALUES ('delete', old.id, old.title);
+    END
+    """,
+    """
+    CREATE TRIGGER entry_title_fts_update AFTER UPDATE OF title ON encyclopedia_entry BEGIN
+        INSERT INTO entry_title_fts(entry_title_fts, rowid, title)
+        VALUES ('delete', old.id, old.title);
+        INSERT INTO entry_title_fts(rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+    "INSERT INTO entry_title_fts(entry_title_fts) VALUES ('rebuild')",
+]
+
+DROP_TITLE_FTS = [
+    "DROP TRIGGER IF EXISTS entry_title_fts_update",
+    "DROP TRIGGER IF EXISTS entry_title_fts_delete",
+    "DROP TRIGGER IF EXISTS entry_title_fts_insert",
+    "DROP TABLE IF EXISTS entry_title_fts",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('encyclopedia', '0004_link_resolved'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TITLE_FTS, DROP_TITLE_FTS),
+    ]
@@ -1,3 +1,62 @@
 from django.db import models
 
-# Create your models here.
+
+class Entry(models.Model):
+    """
+    An encyclopedia entry, used when WIKI_ENTRY_BACKEND is "sqlite".
+    The entry_fts table mirrors title and content for full-text search.
+    """
+    title = models.CharField(max_length=255, unique=True)
+    folded_title = models.CharField(max_length=255, db_index=True)
+    content = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['title']
+        verbose_name_plural = "Entries"
+
+    def __str__(self):
+        return self.title
+
+
+class Revision(models.Model):
+    """
+    One saved version of an entry. Snapshots hold the full Markdown
+    source; other revisions hold a line delta against the previous
+    revision. Both are zlib-compressed JSON.
+    """
+    title = models.CharField(max_length=255)
+    number = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    data = models.BinaryField()
+    size = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['title', '-number']
+        unique_together = [['title', 'number']]
+
+    def __str__(self):
+        return f"{self.title} revision {self.number}"
+
+
+class Link(models.Model):
+    """
+    A link from one entry to another, extracted from the source
+    entry's Markdown when it is saved.
+    """
+    source = models.CharField(max_length=255, db_index=True)
+    target = models.CharField(max_length=255)
+    folded_target = models.CharField(max_length=255, db_index=True)
+    # Whether the target entry exists, kept current on every save so the
+    # file backend can list broken links without resolving each target
+    resolved = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = [['source', 'target']]
+        indexes = [
+            models.Index(fields=['resolved', 'target', 'source'], name='link_resolved_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} -> {self.target}"
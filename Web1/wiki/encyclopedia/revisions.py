@@ -0,0 +1,161 @@
+import json
+import zlib
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import transaction
+from django.dispatch import receiver
+
+from . import store, util
+from .models import Revision
+from .signals import entry_saved, entry_saving
+
+
+def _snapshot_interval():
+    return getattr(settings, "WIKI_REVISION_SNAPSHOT_INTERVAL", 20)
+
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def _unpack(data):
+    return json.loads(zlib.decompress(bytes(data)).decode("utf-8"))
+
+
+def diff(old, new):
+    """
+    Returns a line delta turning old into new: a list of [n] to copy
+    n lines, [-n] to skip n lines, and [lines] to insert lines.
+    """
+    a = old.splitlines(keepends=True)
+    b = new.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(i1 - i2)
+        if j2 > j1:
+            ops.append(b[j1:j2])
+    return ops
+
+
+def patch(old, ops):
+    """
+    Applies a delta produced by diff() to old.
+    """
+    lines = old.splitlines(keepends=True)
+    result = []
+    position = 0
+    for op in ops:
+        if isinstance(op, list):
+            result.extend(op)
+        elif op > 0:
+            result.extend(lines[position:position + op])
+            position += op
+        else:
+            position -= op
+    return "".join(result)
+
+
+def _reconstruct(title, number):
+    """
+    Returns the content of a revision and the number of the snapshot
+    it was rebuilt from, or (None, None) if there is no such revision.
+    """
+    snapshot = (Revision.objects.filter(title=title, is_snapshot=True, number__lte=number)
+                .order_by("-number").first())
+    if snapshot is None:
+        return None, None
+    content = _unpack(snapshot.data)
+    deltas = (Revision.objects.filter(title=title, number__gt=snapshot.number, number__lte=number)
+              .order_by("number").values_list("data", flat=True))
+    expected = snapshot.number
+    for data in deltas:
+        content = patch(content, _unpack(data))
+        expected += 1
+    if expected != number:
+        return None, None
+    return content, snapshot.number
+
+
+def get_revision(title, number):
+    """
+    Returns the Markdown content of the given revision of an entry,
+    or None if there is no such revision.
+    """
+    content, _ = _reconstruct(title, number)
+    return content
+
+
+def get_revision_at(title, when):
+    """
+    Returns the Markdown content an entry had at the given time, from
+    its latest revision recorded by then, or None if it had none.
+    """
+    number = (Revision.objects.filter(title=title, created_at__lte=when)
+              .order_by("-number").values_list("number", flat=True).first())
+    return None if number is None else get_revision(title, number)
+
+
+def list_revisions(title):
+    """
+    Returns an entry's revisions, newest first, without their data.
+    """
+    return Revision.objects.filter(title=title).defer("data").order_by("-number")
+
+
+def record_revision(title, content):
+    """
+    Stores content as the next revision of an entry. A full snapshot
+    is written for the first revision and every
+    WIKI_REVISION_SNAPSHOT_INTERVAL revisions after the previous one;
+    otherwise only the delta from the previous revision is stored.
+    Returns the new revision, or None if content is unchanged.
+    """
+    with store.write_lock, transaction.atomic():
+        latest = Revision.objects.filter(title=title).order_by("-number").values_list("number", flat=True).first()
+        previous, snapshot_number = (None, None) if latest is None else _reconstruct(title, latest)
+        if previous is not None and previous == content:
+            return None
+        number = (latest or 0) + 1
+        if previous is None or number - snapshot_number >= _snapshot_interval():
+            return Revision.objects.create(title=title, number=number, is_snapshot=True,
+                                           data=_pack(content), size=len(content))
+        return Revision.objects.create(title=title, number=number, is_snapshot=False,
+                                       data=_pack(diff(previous, content)), size=len(content))
+
+
+def record_baseline(title):
+    """
+    Stores an entry's current content as its first revision if it has
+    none yet, dated when that content was last saved, so the version
+    written before revisions were recorded is kept when it is replaced.
+    Returns the new revision, or None.
+    """
+    with store.write_lock, transaction.atomic():
+        if Revision.objects.filter(title=title).exists():
+            return None
+        content = util.get_entry(title)
+        if content is None:
+            return None
+        revision = Revision.objects.create(title=title, number=1, is_snapshot=True,
+                                           data=_pack(content), size=len(content))
+        modified = util.entry_modified_time(title)
+        if modified is not None:
+            # created_at is set on insert; backdate it to the content's age
+            Revision.objects.filter(pk=revision.pk).update(created_at=modified)
+            revision.created_at = modified
+        return revision
+
+
+@receiver(entry_saving)
+def record_previous_entry(sender, title, **kwargs):
+    record_baseline(title)
+
+
+@receiver(entry_saved)
+def record_saved_entry(sender, title, content, **kwargs):
+    record_revision(title, content)
@@ -0,0 +1,270 @@
+import atexit
+import heapq
+import json
+import math
+import re
+import threading
+import zlib
+from collections import Counter, defaultdict
+
+from django.core.files.storage import default_storage
+from django.db.models import Max
+from django.dispatch import receiver
+
+from . import store, util
+from .models import Revision
+from .signals import entry_saved
+
+
+INDEX_PATH = "entries/.index/search.json.z"
+
+# Terms in an entry's title count this many times towards its score
+TITLE_WEIGHT = 3
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Incremental updates after which the index is written back to disk
+SAVE_INTERVAL = 50
+
+_token_re = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    Splits text into case-folded word tokens.
+    """
+    return _token_re.findall(text.casefold())
+
+
+class SearchIndex:
+    """
+    Inverted index over entry titles and Markdown bodies, ranked
+    with BM25.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.terms = {}
+        self.lengths = {}
+        self.mtimes = {}
+        self.total_length = 0
+
+    def add(self, title, content, mtime=None):
+        """Index an entry, replacing any previous version of it."""
+        self.remove(title)
+        counts = Counter(tokenize(content))
+        for term in tokenize(title):
+            counts[term] += TITLE_WEIGHT
+        for term, tf in counts.items():
+            self.postings[term][title] = tf
+        length = sum(counts.values())
+        self.terms[title] = list(counts)
+        self.lengths[title] = length
+        self.mtimes[title] = mtime
+        self.total_length += length
+
+    def remove(self, title):
+        """Drop an entry from the index, if present."""
+        for term in self.terms.pop(title, ()):
+            docs = self.postings[term]
+            docs.pop(title, None)
+            if not docs:
+                del self.postings[term]
+        self.total_length -= self.lengths.pop(title, 0)
+        self.mtimes.pop(title, None)
+
+    def search(self, query, limit=20):
+        """Return up to limit titles ranked by BM25 score for the query."""
+        terms = set(tokenize(query))
+        count = len(self.lengths)
+        if not terms or not count:
+            return []
+        # Constant parts of the BM25 formula are hoisted out of the
+        # per-posting loop, which dominates the cost of a search
+        lengths = self.lengths
+        base = K1 * (1 - B)
+        scale = K1 * B * count / self.total_length
+        scores = defaultdict(float)
+        for term in terms:
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            weight = (K1 + 1) * math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for title, tf in docs.items():
+                scores[title] += weight * tf / (tf + base + scale * lengths[title])
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [title for title, _ in best]
+
+    def dump(self):
+        """Serialize the index to compressed JSON bytes."""
+        titles = list(self.lengths)
+        ids = {title: i for i, title in enumerate(titles)}
+        data = {
+            "docs": [[title, self.mtimes[title], self.lengths[title]] for title in titles],
+            "postings": {
+                term: [value for title, tf in docs.items() for value in (ids[title], tf)]
+                for term, docs in self.postings.items()
+            },
+        }
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def load(cls, raw):
+        """Rebuild an index from bytes produced by dump()."""
+        data = json.loads(zlib.decompress(raw).decode("utf-8"))
+        index = cls()
+        titles = [title for title, _, _ in data["docs"]]
+        terms = defaultdict(list)
+        for title, mtime, length in data["docs"]:
+            index.mtimes[title] = mtime
+            index.lengths[title] = length
+            index.total_length += length
+        for term, flat in data["postings"].items():
+            docs = index.postings[term]
+            for i in range(0, len(flat), 2):
+                title = titles[flat[i]]
+                docs[title] = flat[i + 1]
+                terms[title].append(term)
+        index.terms = dict(terms)
+        return index
+
+
+_lock = threading.Lock()
+_index = None
+_unsaved = 0
+# Id of the newest revision reflected in the index. Every save, in any
+# worker, records a revision, so a newer one means the index is stale
+_seen_revision = 0
+
+
+def _entry_mtime(title):
+    modified = util.entry_modified_time(title)
+    return modified.timestamp() if modified is not None else None
+
+
+def _read_index():
+    try:
+        with default_storage.open(INDEX_PATH) as f:
+            return SearchIndex.load(f.read())
+    except (FileNotFoundError, ValueError, zlib.error):
+        return SearchIndex()
+
+
+def _write_index(index):
+    util.replace_file(INDEX_PATH, index.dump())
+
+
+def _build_index():
+    """
+    Loads the persisted index and brings it up to date, re-tokenizing
+    only entries that were added or modified since it was written.
+    """
+    index = _read_index()
+    changed = False
+    current = set(util.list_entries())
+    for title in list(index.lengths):
+        if title not in current:
+            index.remove(title)
+            changed = True
+    for title in current:
+        mtime = _entry_mtime(title)
+        if title in index.lengths and index.mtimes.get(title) == mtime:
+            continue
+        content = util.get_entry(title)
+        if content is not None:
+            index.add(title, content, mtime)
+            changed = True
+    if changed:
+        _write_index(index)
+    return index
+
+
+def _latest_revision():
+    return Revision.objects.aggregate(latest=Max("id"))["latest"] or 0
+
+
+def _refresh_index(index):
+    """
+    Re-indexes the entries saved by other workers since the index was
+    last brought up to date, found from the revisions recorded since.
+    """
+    global _seen_revision, _unsaved
+    seen = _seen_revision
+    latest = _latest_revision()
+    if latest <= seen:
+        return
+    titles = set(Revision.objects.filter(id__gt=seen, id__lte=latest).values_list("title", flat=True))
+    for title in titles:
+        mtime = _entry_mtime(title)
+        with _lock:
+            if title in index.lengths and index.mtimes.get(title) == mtime:
+                continue
+        content = util.get_entry(title)
+        with _lock:
+            if content is None:
+                index.remove(title)
+            else:
+                index.add(title, content, mtime)
+            _unsaved += 1
+    with _lock:
+        _seen_revision = max(_seen_revision, latest)
+
+
+def get_index():
+    """
+    Returns the process-wide search index, building it on first use and
+    refreshing it with entries other workers have saved since.
+    """
+    global _index, _seen_revision
+    with _lock:
+        if _index is None:
+            # Taken before the build so no save made during it is missed
+            _seen_revision = _latest_revision()
+            _index = _build_index()
+            atexit.register(save_index)
+            return _index
+        index = _index
+    _refresh_index(index)
+    return index
+
+
+def search(query, limit=20):
+    """
+    Returns up to limit entry titles whose title or body matches the
+    query, best match first.
+    """
+    if util.database_backend():
+        return store.search(tokenize(query), limit, TITLE_WEIGHT)
+    index = get_index()
+    with _lock:
+        return index.search(query, limit)
+
+
+def save_index():
+    """
+    Persists the in-memory index if it has unsaved updates, so the next
+    process can load it without re-tokenizing the edited entries. Runs
+    every SAVE_INTERVAL updates and when the process exits.
+    """
+    global _unsaved
+    with _lock:
+        if _index is not None and _unsaved:
+            _write_index(_index)
+            _unsaved = 0
+
+
+@receiver(entry_saved)
+def update_index(sender, title, content, **kwargs):
+    global _unsaved
+    if util.database_backend():
+        return
+    with _lock:
+        if _index is None:
+            return
+        _index.add(title, content, _entry_mtime(title))
+        _unsaved += 1
+        due = _unsaved >= SAVE_INTERVAL
+    if due:
+        save_index()
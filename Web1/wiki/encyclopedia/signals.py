@@ -0,0 +1,10 @@
+from django.dispatch import Signal
+
+
+# Sent by util.save_entry() before an entry is written, with the entry's
+# title, while the previous content can still be read.
+entry_saving = Signal()
+
+# Sent by util.save_entry() after an entry has been written, with the
+# entry's title and Markdown content.
+entry_saved = Signal()
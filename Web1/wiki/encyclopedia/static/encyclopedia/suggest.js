@@ -0,0 +1,31 @@
+document.addEventListener('DOMContentLoaded', function() {
+
+  const input = document.querySelector('#search-input');
+  const list = document.querySelector('#search-suggestions');
+  if (!input || !list) {
+    return;
+  }
+
+  // Fetch title completions as the user types
+  input.addEventListener('input', () => {
+    const query = input.value.trim();
+    if (!query) {
+      list.innerHTML = '';
+      return;
+    }
+    fetch(`${input.dataset.suggestUrl}?q=${encodeURIComponent(query)}`)
+    .then(response => response.json())
+    .then(result => {
+      // Ignore responses for queries the user has already typed past
+      if (result.query !== input.value.trim()) {
+        return;
+      }
+      list.innerHTML = '';
+      result.suggestions.forEach(title => {
+        const option = document.createElement('option');
+        option.value = title;
+        list.append(option);
+      });
+    });
+  });
+});
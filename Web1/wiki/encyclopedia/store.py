@@ -0,0 +1,120 @@
+import random
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .models import Entry
+
+
+# Database-backed implementations of the util entry API, used when
+# WIKI_ENTRY_BACKEND is "sqlite". Full-text search goes through the
+# entry_fts FTS5 table created by the initial migration.
+
+# SQLite allows a single writer, and two transactions that both read
+# before writing fail with "database is locked" rather than waiting.
+# Write transactions in this process are serialized on this lock.
+write_lock = threading.Lock()
+
+
+def list_entries():
+    return list(Entry.objects.order_by("title").values_list("title", flat=True))
+
+
+def find_entry(title):
+    return (Entry.objects.filter(folded_title=title.casefold())
+            .order_by("title").values_list("title", flat=True).first())
+
+
+def complete_entries(prefix, limit=10):
+    prefix = prefix.casefold()
+    if not prefix or limit <= 0:
+        return []
+    # A range scan on folded_title uses its index, unlike LIKE 'prefix%'
+    return list(Entry.objects
+                .filter(folded_title__gte=prefix, folded_title__lt=prefix + "\U0010ffff")
+                .order_by("folded_title", "title")
+                .values_list("title", flat=True)[:limit])
+
+
+def search_titles(query, limit=10):
+    """
+    Returns up to limit titles whose case-folded form contains query,
+    which must be case-folded. Queries of three or more characters use
+    the entry_title_fts trigram index; shorter ones walk the folded_title
+    index and stop after limit matches.
+    """
+    if len(query) < 3:
+        return list(Entry.objects.filter(folded_title__contains=query)
+                    .order_by("folded_title", "title").values_list("title", flat=True)[:limit])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT e.title FROM entry_title_fts f JOIN encyclopedia_entry e ON e.id = f.rowid "
+            "WHERE entry_title_fts MATCH %s ORDER BY e.folded_title, e.title LIMIT %s",
+            ['"{}"'.format(query.replace('"', '""')), limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def random_entry():
+    """
+    Returns a random title by sampling primary keys, so the cost does
+    not grow with the number of entries. Ids left behind by deleted
+    rows are retried a few times before falling back to the next id.
+    """
+    max_id = Entry.objects.aggregate(max_id=Max("id"))["max_id"]
+    if max_id is None:
+        return None
+    for _ in range(3):
+        title = Entry.objects.filter(id=random.randint(1, max_id)).values_list("title", flat=True).first()
+        if title is not None:
+            return title
+    return (Entry.objects.filter(id__gte=random.randint(1, max_id))
+            .order_by("id").values_list("title", flat=True).first())
+
+
+def save_entry(title, content):
+    with write_lock:
+        Entry.objects.update_or_create(title=title, defaults={
+            "folded_title": title.casefold(),
+            "content": content,
+        })
+
+
+def save_entries(entries):
+    """
+    Saves many (title, content) pairs in one transaction, replacing
+    existing entries with the same titles.
+    """
+    entries = dict(entries)
+    with write_lock, transaction.atomic():
+        Entry.objects.filter(title__in=list(entries)).delete()
+        Entry.objects.bulk_create([
+            Entry(title=title, folded_title=title.casefold(), content=content)
+            for title, content in entries.items()
+        ])
+
+
+def get_entry(title):
+    return Entry.objects.filter(title=title).values_list("content", flat=True).first()
+
+
+def entry_modified_time(title):
+    return Entry.objects.filter(title=title).values_list("updated_at", flat=True).first()
+
+
+def search(terms, limit=20, title_weight=1.0):
+    """
+    Returns up to limit titles matching any of the given terms, ranked
+    by FTS5's bm25() with title matches weighted by title_weight.
+    """
+    if not terms or limit <= 0:
+        return []
+    match = " OR ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT title FROM entry_fts WHERE entry_fts MATCH %s "
+            "ORDER BY bm25(entry_fts, %s, 1.0) LIMIT %s",
+            [match, float(title_weight), limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
@@ -1,3 +1,83 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
-# Create your tests here.
+from . import revisions, store, util
+from .models import Revision
+
+
+class DiffPatchTests(SimpleTestCase):
+    """patch(old, diff(old, new)) must rebuild new exactly."""
+
+    CASES = [
+        ("trailing newline", "one\ntwo\nthree\n", "one\n2\nthree\nfour\n"),
+        ("no trailing newline", "one\ntwo\nthree", "one\ntwo\nthree!"),
+        ("newline added at end", "one\ntwo", "one\ntwo\n"),
+        ("newline removed at end", "one\ntwo\n", "one\ntwo"),
+        ("from empty", "", "# Title\n\nBody"),
+        ("to empty", "# Title\n\nBody\n", ""),
+        ("both empty", "", ""),
+        ("pure insertion", "a\nc\n", "a\nb1\nb2\nc\n"),
+        ("insertion at start", "b\nc", "a\nb\nc"),
+        ("pure deletion", "a\nb1\nb2\nc\n", "a\nc\n"),
+        ("deletion at end", "a\nb\nc", "a"),
+        ("unchanged", "same\ntext", "same\ntext"),
+    ]
+
+    def test_round_trip(self):
+        for name, old, new in self.CASES:
+            with self.subTest(name):
+                self.assertEqual(revisions.patch(old, revisions.diff(old, new)), new)
+
+    def test_pure_insertion_and_deletion_ops(self):
+        self.assertEqual(revisions.diff("a\nc\n", "a\nb\nc\n"), [1, ["b\n"], 1])
+        self.assertEqual(revisions.diff("a\nb\nc\n", "a\nc\n"), [1, -1, 1])
+
+
+@override_settings(WIKI_REVISION_SNAPSHOT_INTERVAL=3)
+class RevisionStoreTests(TestCase):
+    """Stored revisions must reconstruct every version that was saved."""
+
+    def test_reconstructs_across_snapshot_boundaries(self):
+        versions = [f"# Entry\n\nversion {i}\n" + "line\n" * i for i in range(8)]
+        versions[4] = versions[4].rstrip("\n")
+        versions[5] = ""
+        for content in versions:
+            revisions.record_revision("Entry", content)
+
+        snapshots = list(Revision.objects.filter(title="Entry", is_snapshot=True)
+                         .order_by("number").values_list("number", flat=True))
+        self.assertEqual(snapshots, [1, 4, 7])
+        for number, content in enumerate(versions, start=1):
+            with self.subTest(number=number):
+                self.assertEqual(revisions.get_revision("Entry", number), content)
+
+    def test_unchanged_content_is_not_recorded(self):
+        self.assertIsNotNone(revisions.record_revision("Entry", "text\n"))
+        self.assertIsNone(revisions.record_revision("Entry", "text\n"))
+        self.assertIsNotNone(revisions.record_revision("Entry", "text"))
+        self.assertEqual(Revision.objects.filter(title="Entry").count(), 2)
+        self.assertEqual(revisions.get_revision("Entry", 2), "text")
+
+    def test_missing_revision(self):
+        revisions.record_revision("Entry", "text")
+        self.assertIsNone(revisions.get_revision("Entry", 2))
+        self.assertIsNone(revisions.get_revision("Other", 1))
+
+
+@override_settings(WIKI_ENTRY_BACKEND="sqlite")
+class BaselineRevisionTests(TestCase):
+    """Content written before revisions were recorded must survive an edit."""
+
+    def test_first_edit_keeps_previous_content(self):
+        store.save_entry("CSS", "original\n")
+        util.save_entry("CSS", "edited\n")
+
+        self.assertEqual(revisions.get_revision("CSS", 1), "original\n")
+        self.assertEqual(revisions.get_revision("CSS", 2), "edited\n")
+        baseline, edit = Revision.objects.filter(title="CSS").order_by("number")
+        self.assertTrue(baseline.is_snapshot)
+        self.assertLessEqual(baseline.created_at, edit.created_at)
+
+    def test_new_entry_has_no_baseline(self):
+        util.save_entry("New", "content")
+        self.assertEqual(Revision.objects.filter(title="New").count(), 1)
+        self.assertEqual(revisions.get_revision("New", 1), "content")
@@ -6,7 +6,12 @@ urlpatterns = [
     path("", views.index, name="index"),
     path("wiki/<str:title>/", views.entry, name="entry"),
     path("wiki/<str:title>/edit/", views.edit, name="edit"),
+    path("wiki/<str:title>/history/", views.history, name="history"),
+    path("wiki/<str:title>/history/<int:number>/", views.revision, name="revision"),
+    path("wiki/<str:title>/backlinks/", views.backlinks, name="backlinks"),
+    path("links/broken/", views.broken_links, name="broken_links"),
     path("search/", views.search, name="search"),
+    path("search/suggest/", views.suggest, name="suggest"),
     path("random/", views.random_page, name="random"),
     path("new/", views.new_page, name="new_page")
 ]
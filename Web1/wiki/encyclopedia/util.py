@@ -1,16 +1,288 @@
+import bisect
+import hashlib
+import os
+import random
 import re
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import markdown2
+from django.conf import settings
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 
+from . import store
+from .signals import entry_saved, entry_saving
+
+
+# In-process index of the entries directory. The sorted title list, the
+# case-folded lookup map and the case-folded prefix list are rebuilt only
+# when the directory's mtime changes, and save_entry() keeps them current
+# in place.
+_index_lock = threading.Lock()
+_index_titles = None
+_index_lookup = {}
+_index_folded = []
+_index_mtime = None
+# Trigram -> titles whose case-folded form contains it, built on the first
+# infix title search and dropped whenever the index above is rebuilt
+_index_trigrams = None
+
+# Shortest query search_titles() matches anywhere in a title
+TRIGRAM = 3
+
+
+def database_backend():
+    """
+    Returns True if entries are stored in the database rather than as
+    Markdown files, as selected by WIKI_ENTRY_BACKEND.
+    """
+    return getattr(settings, "WIKI_ENTRY_BACKEND", "files") == "sqlite"
+
+
+def _entries_mtime():
+    try:
+        return default_storage.get_modified_time("entries")
+    except (FileNotFoundError, NotImplementedError):
+        return None
+
+
+def _install_index(titles, mtime):
+    """
+    Replaces the entry index with the given sorted titles. The caller
+    must hold _index_lock.
+    """
+    global _index_titles, _index_lookup, _index_folded, _index_mtime, _index_trigrams
+    lookup = {}
+    for title in titles:
+        lookup.setdefault(title.casefold(), title)
+    _index_titles = titles
+    _index_lookup = lookup
+    _index_folded = sorted((title.casefold(), title) for title in titles)
+    _index_mtime = mtime
+    _index_trigrams = None
+
+
+def _trigrams(text):
+    return {text[i:i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+
+
+def _add_trigrams(trigrams, title):
+    for trigram in _trigrams(title.casefold()):
+        trigrams.setdefault(trigram, set()).add(title)
+
+
+def _load_index():
+    """
+    Returns the sorted title list, rescanning the entries directory
+    if it has changed since the index was last built.
+    """
+    mtime = _entries_mtime()
+    with _index_lock:
+        if _index_titles is None or mtime is None or mtime != _index_mtime:
+            _, filenames = default_storage.listdir("entries")
+            _install_index(sorted(re.sub(r"\.md$", "", filename)
+                                  for filename in filenames if filename.endswith(".md")),
+                           mtime)
+        return _index_titles
+
+
+def _drop_index():
+    """
+    Empties the entry index. The caller must hold _index_lock.
+    """
+    global _index_titles, _index_lookup, _index_folded, _index_mtime, _index_trigrams
+    _index_titles, _index_lookup, _index_folded, _index_mtime = None, {}, [], None
+    _index_trigrams = None
+
+
+def invalidate_entries():
+    """
+    Drops the cached entry index so that the next lookup rescans the
+    entries directory.
+    """
+    with _index_lock:
+        _drop_index()
+
 
 def list_entries():
     """
     Returns a list of all names of encyclopedia entries.
     """
-    _, filenames = default_storage.listdir("entries")
-    return list(sorted(re.sub(r"\.md$", "", filename)
-                for filename in filenames if filename.endswith(".md")))
+    if database_backend():
+        return store.list_entries()
+    return list(_load_index())
+
+
+def find_entry(title):
+    """
+    Returns the stored title of the entry matching the given title
+    case-insensitively, or None if there is no such entry.
+    """
+    if database_backend():
+        return store.find_entry(title)
+    _load_index()
+    return _index_lookup.get(title.casefold())
+
+
+def complete_entries(prefix, limit=10):
+    """
+    Returns up to limit entry titles starting with the given prefix,
+    compared case-insensitively, in alphabetical order.
+    """
+    if database_backend():
+        return store.complete_entries(prefix, limit)
+    _load_index()
+    prefix = prefix.casefold()
+    if not prefix:
+        return []
+    with _index_lock:
+        folded = _index_folded
+        position = bisect.bisect_left(folded, (prefix,))
+        matches = []
+        while position < len(folded) and len(matches) < limit:
+            key, title = folded[position]
+            if not key.startswith(prefix):
+                break
+            matches.append(title)
+            position += 1
+        return matches
+
+
+def search_titles(query, limit=10):
+    """
+    Returns up to limit entry titles containing the given query anywhere,
+    compared case-insensitively, in alphabetical order. Candidates come
+    from a trigram index; queries shorter than a trigram match densely,
+    so they walk the sorted titles and stop after limit matches.
+    """
+    query = query.casefold()
+    if not query or limit <= 0:
+        return []
+    if database_backend():
+        return store.search_titles(query, limit)
+    global _index_trigrams
+    _load_index()
+    with _index_lock:
+        if len(query) < TRIGRAM:
+            return list(islice((title for key, title in _index_folded if query in key), limit))
+        if _index_trigrams is None:
+            _index_trigrams = {}
+            for title in _index_titles or ():
+                _add_trigrams(_index_trigrams, title)
+        postings = sorted((_index_trigrams.get(trigram, ()) for trigram in _trigrams(query)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+    return sorted((title for title in candidates if query in title.casefold()),
+                  key=lambda title: (title.casefold(), title))[:limit]
+
+
+def random_entry():
+    """
+    Returns the title of a random encyclopedia entry, or None if there
+    are no entries.
+    """
+    if database_backend():
+        return store.random_entry()
+    titles = _load_index()
+    return random.choice(titles) if titles else None
+
+
+def _index_entry(title, previous_mtime):
+    """
+    Adds a newly written entry file to the in-process index, given the
+    entries directory's mtime from before the write. If the directory
+    had already changed since the last scan, another worker has written
+    to it, so the index is dropped to be rescanned instead.
+    """
+    global _index_mtime
+    with _index_lock:
+        if previous_mtime is None or previous_mtime != _index_mtime:
+            _drop_index()
+        elif _index_titles is not None:
+            position = bisect.bisect_left(_index_titles, title)
+            if position == len(_index_titles) or _index_titles[position] != title:
+                _index_titles.insert(position, title)
+                _index_lookup.setdefault(title.casefold(), title)
+                bisect.insort(_index_folded, (title.casefold(), title))
+                if _index_trigrams is not None:
+                    _add_trigrams(_index_trigrams, title)
+            _index_mtime = _entries_mtime()
+
+
+# Striped in-process locks backing the optional per-title write locks
+_write_locks = [threading.Lock() for _ in range(64)]
+
+
+@contextmanager
+def _entry_write_lock(title):
+    """
+    Serializes writers of the same entry when WIKI_WRITE_LOCKS is set,
+    across threads and, where flock() is available, across worker
+    processes sharing the entries directory.
+    """
+    if not getattr(settings, "WIKI_WRITE_LOCKS", False):
+        yield
+        return
+    with _write_locks[hash(title) % len(_write_locks)]:
+        try:
+            name = hashlib.sha256(title.encode("utf-8")).hexdigest()
+            path = default_storage.path(f"entries/.locks/{name}.lock")
+        except NotImplementedError:
+            path = None
+        if fcntl is None or path is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def replace_file(name, content):
+    """
+    Writes bytes to the given storage name, replacing any existing
+    file. With WIKI_ATOMIC_WRITES (the default) on a filesystem
+    storage, the data is written to a temporary file that is then
+    renamed over the target, so readers see either the old or the new
+    file and never a missing or partial one.
+    """
+    path = None
+    if getattr(settings, "WIKI_ATOMIC_WRITES", True):
+        try:
+            path = default_storage.path(name)
+        except NotImplementedError:
+            pass
+    if path is None:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        default_storage.save(name, ContentFile(content))
+        return
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.chmod(temp_path, default_storage.file_permissions_mode or 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
 
 
 def save_entry(title, content):
@@ -19,10 +291,17 @@ def save_entry(title, content):
     content. If an existing entry with the same title already exists,
     it is replaced.
     """
-    filename = f"entries/{title}.md"
-    if default_storage.exists(filename):
-        default_storage.delete(filename)
-    default_storage.save(filename, ContentFile(content))
+    with _entry_write_lock(title):
+        entry_saving.send(sender=None, title=title)
+        if database_backend():
+            store.save_entry(title, content)
+        else:
+            previous_mtime = _entries_mtime()
+            replace_file(f"entries/{title}.md", content.encode("utf-8"))
+            _index_entry(title, previous_mtime)
+
+        _invalidate_render(title)
+        entry_saved.send(sender=None, title=title, content=content)
 
 
 def get_entry(title):
@@ -30,8 +309,105 @@ def get_entry(title):
     Retrieves an encyclopedia entry by its title. If no such
     entry exists, the function returns None.
     """
+    if database_backend():
+        return store.get_entry(title)
     try:
-        f = default_storage.open(f"entries/{title}.md")
-        return f.read().decode("utf-8")
+        with default_storage.open(f"entries/{title}.md") as f:
+            return f.read().decode("utf-8")
     except FileNotFoundError:
         return None
+
+
+def entry_modified_time(title):
+    """
+    Returns the time an encyclopedia entry was last saved, without
+    reading its content. If no such entry exists, the function returns
+    None.
+    """
+    if database_backend():
+        return store.entry_modified_time(title)
+    try:
+        return default_storage.get_modified_time(f"entries/{title}.md")
+    except FileNotFoundError:
+        return None
+
+
+# Rendered HTML for entries, keyed by title and a hash of the Markdown
+# source. The in-memory layer is an LRU bounded by WIKI_RENDER_CACHE_SIZE;
+# the optional on-disk layer under entries/.cache/ is enabled with
+# WIKI_RENDER_CACHE_DISK and survives restarts.
+_render_lock = threading.Lock()
+_render_cache = OrderedDict()
+_render_digests = {}
+_render_stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+
+def _render_cache_path(title):
+    name = hashlib.sha256(title.encode("utf-8")).hexdigest()
+    return f"entries/.cache/{name}.html"
+
+
+def _invalidate_render(title):
+    with _render_lock:
+        digest = _render_digests.pop(title, None)
+        if digest is not None:
+            _render_cache.pop((title, digest), None)
+    if getattr(settings, "WIKI_RENDER_CACHE_DISK", False):
+        default_storage.delete(_render_cache_path(title))
+
+
+def render_entry(title, content):
+    """
+    Returns the HTML for an entry's Markdown content, converting it
+    with markdown2 only if it is not already cached.
+    """
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    key = (title, digest)
+    with _render_lock:
+        html = _render_cache.get(key)
+        if html is not None:
+            _render_cache.move_to_end(key)
+            _render_stats["hits"] += 1
+            return html
+
+    # Disk cache files hold the source digest on their first line
+    use_disk = getattr(settings, "WIKI_RENDER_CACHE_DISK", False)
+    path = _render_cache_path(title)
+    if use_disk:
+        try:
+            with default_storage.open(path) as f:
+                cached_digest, _, cached_html = f.read().decode("utf-8").partition("\n")
+            if cached_digest == digest:
+                html = cached_html
+        except FileNotFoundError:
+            pass
+
+    with _render_lock:
+        _render_stats["disk_hits" if html is not None else "misses"] += 1
+    if html is None:
+        html = markdown2.markdown(content)
+        if use_disk:
+            replace_file(path, f"{digest}\n{html}".encode("utf-8"))
+
+    maxsize = getattr(settings, "WIKI_RENDER_CACHE_SIZE", 256)
+    with _render_lock:
+        stale = _render_digests.get(title)
+        if stale is not None and stale != digest:
+            _render_cache.pop((title, stale), None)
+        _render_digests[title] = digest
+        _render_cache[key] = html
+        while len(_render_cache) > maxsize:
+            (old_title, _), _ = _render_cache.popitem(last=False)
+            _render_digests.pop(old_title, None)
+    return html
+
+
+def render_cache_stats():
+    """
+    Returns the render cache's hit, disk hit and miss counters along
+    with its current and maximum size.
+    """
+    with _render_lock:
+        return dict(_render_stats,
+                    size=len(_render_cache),
+                    maxsize=getattr(settings, "WIKI_RENDER_CACHE_SIZE", 256))
@@ -1,10 +1,11 @@
 from django.shortcuts import render, redirect
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse
 from django.urls import reverse
-import random
+from django.views.decorators.http import condition
+import hashlib
 import markdown2
 
-from . import util
+from . import links, revisions, search as fulltext, util
 
 
 def index(request):
@@ -13,6 +14,21 @@ def index(request):
     })
 
 
+def entry_etag(request, title):
+    """
+    Compute an entry page's ETag from its title and modification time.
+    """
+    modified = util.entry_modified_time(title)
+    if modified is None:
+        return None
+    return hashlib.sha256(f"{title}\0{modified.timestamp()}".encode("utf-8")).hexdigest()[:32]
+
+
+def entry_last_modified(request, title):
+    return util.entry_modified_time(title)
+
+
+@condition(etag_func=entry_etag, last_modified_func=entry_last_modified)
 def entry(request, title):
     """
     Display an individual encyclopedia entry.
@@ -24,7 +40,7 @@ def entry(request, title):
         })
     
     # Convert markdown to HTML
-    html_content = markdown2.markdown(content)
+    html_content = util.render_entry(title, content)
     
     return render(request, "encyclopedia/entry.html", {
         "title": title,
@@ -55,6 +71,63 @@ def edit(request, title):
     })
 
 
+def history(request, title):
+    """
+    List the saved revisions of an encyclopedia entry.
+    """
+    entry_revisions = revisions.list_revisions(title)
+    if not entry_revisions and util.get_entry(title) is None:
+        return render(request, "encyclopedia/error.html", {
+            "message": f"Entry '{title}' not found."
+        })
+    
+    return render(request, "encyclopedia/history.html", {
+        "title": title,
+        "revisions": entry_revisions
+    })
+
+
+def revision(request, title, number):
+    """
+    Display an earlier revision of an encyclopedia entry.
+    """
+    content = revisions.get_revision(title, number)
+    if content is None:
+        return render(request, "encyclopedia/error.html", {
+            "message": f"Revision {number} of '{title}' not found."
+        })
+    
+    return render(request, "encyclopedia/revision.html", {
+        "title": title,
+        "number": number,
+        "content": markdown2.markdown(content)
+    })
+
+
+def backlinks(request, title):
+    """
+    List the encyclopedia entries that link to an entry.
+    """
+    return render(request, "encyclopedia/backlinks.html", {
+        "title": title,
+        "exists": util.find_entry(title) is not None,
+        "backlinks": links.backlinks(title)
+    })
+
+
+def broken_links(request):
+    """
+    List links to encyclopedia entries that do not exist.
+    """
+    return render(request, "encyclopedia/broken_links.html", {
+        "links": links.broken_links()
+    })
+
+
+# Most titles listed for each kind of search match
+SEARCH_RESULTS = 20
+
+
 def search(request):
     """
     Handle search functionality for encyclopedia entries.
@@ -69,23 +142,45 @@ def search(request):
     if not query:
         return redirect("index")
     
-    # Get all entries
-    entries = util.list_entries()
-    
     # Check for exact match (case-insensitive)
-    for entry in entries:
-        if entry.lower() == query.lower():
-            return redirect("entry", title=entry)
-    
-    # Find partial matches (case-insensitive)
-    matches = []
-    for entry in entries:
-        if query.lower() in entry.lower():
-            matches.append(entry)
+    exact = util.find_entry(query)
+    if exact is not None:
+        return redirect("entry", title=exact)
     
     return render(request, "encyclopedia/search_results.html", {
         "query": query,
-        "matches": matches
+        "matches": search_matches(query)
+    })
+
+
+def search_matches(query):
+    """
+    Returns the titles starting with the query, then the other titles
+    containing it, then ranked full-text matches, which weight words in
+    the title highest. None of the lookups scans every title.
+    """
+    matches = []
+    seen = set()
+    for titles in (util.complete_entries(query, SEARCH_RESULTS),
+                   util.search_titles(query, SEARCH_RESULTS),
+                   fulltext.search(query, SEARCH_RESULTS)):
+        matches += [title for title in titles if title not in seen]
+        seen.update(titles)
+    return matches
+
+
+def suggest(request):
+    """
+    Return title completions for the search box as JSON.
+    """
+    query = request.GET.get("q", "").strip()
+    try:
+        limit = min(int(request.GET.get("limit", 10)), 50)
+    except ValueError:
+        limit = 10
+    return JsonResponse({
+        "query": query,
+        "suggestions": util.complete_entries(query, limit)
     })
 
 
@@ -105,8 +200,7 @@ def new_page(request):
             })
         
         # Check if entry already exists (case-insensitive)
-        existing_entries = util.list_entries()
-        if any(entry.lower() == title.lower() for entry in existing_entries):
+        if util.find_entry(title) is not None:
             return render(request, "encyclopedia/new.html", {
                 "error": f"An entry with the title '{title}' already exists.",
                 "title": title,
@@ -125,9 +219,8 @@ def random_page(request):
     """
     Redirect to a random encyclopedia entry.
     """
-    entries = util.list_entries()
-    if entries:
-        random_entry = random.choice(entries)
+    random_entry = util.random_entry()
+    if random_entry is not None:
         return redirect("entry", title=random_entry)
     else:
         return redirect("index")
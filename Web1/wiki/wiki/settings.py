@@ -78,6 +78,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Write-ahead logging lets a long read, such as wiki_export's
+        # snapshot transaction, run alongside writers instead of
+        # blocking them until "database is locked"
+        'OPTIONS': {
+            'init_command': 'PRAGMA journal_mode=WAL',
+        },
     }
 }
 
@@ -119,3 +125,33 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.0/howto/static-files/
 
 STATIC_URL = '/static/'
+
+
+# Encyclopedia
+# Entries are stored as Markdown files under entries/ ("files") or in the
+# database with an FTS5 search table ("sqlite"); run wiki_migrate_entries
+# to copy existing files into the database.
+
+WIKI_ENTRY_BACKEND = "files"
+
+# Rendered entry HTML is cached in memory (LRU) and optionally on disk
+# under entries/.cache/.
+
+WIKI_RENDER_CACHE_SIZE = 256
+
+WIKI_RENDER_CACHE_DISK = False
+
+# Entries are written to a temporary file and renamed into place. Enable
+# WIKI_WRITE_LOCKS to also serialize writers of the same entry across
+# worker processes.
+
+WIKI_ATOMIC_WRITES = True
+
+WIKI_WRITE_LOCKS = False
+
+# Every save is recorded as a compressed revision, and the content an entry
+# had before its first recorded save is kept as its first revision. A full
+# snapshot is kept every WIKI_REVISION_SNAPSHOT_INTERVAL revisions, deltas
+# in between.
+
+WIKI_REVISION_SNAPSHOT_INTERVAL = 20
@@ -0,0 +1,61 @@
+import random
+import time
+
+from django.db import OperationalError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import events
+from .models import Listing, Bid
+
+
+class BidRejected(Exception):
+    """Raised when a bid cannot be placed. The message is shown to the bidder."""
+
+
+def _rejection_message(listing_id, user, amount):
+    """Explain why the compare-and-set update matched no row"""
+    listing = Listing.objects.filter(pk=listing_id).values('active', 'ends_at', 'creator_id', 'current_price').first()
+    if listing is None:
+        return "This listing does not exist."
+    if not listing['active']:
+        return "This auction is no longer active."
+    if listing['ends_at'] is not None and listing['ends_at'] <= timezone.now():
+        return "This auction has ended."
+    if listing['creator_id'] == user.id:
+        return "You cannot bid on your own listing."
+    return f"Bid must be higher than current price of ${listing['current_price']}."
+
+
+def place_bid(listing_id, user, amount, retries=5):
+    """
+    Place a bid with an atomic compare-and-set on the listing's current
+    price, so concurrent bids can never overwrite a higher one.
+    
+    The conditional UPDATE only matches while the listing is active,
+    not past its end time, not owned by the bidder and priced below
+    amount; if it matches nothing the bid is rejected with BidRejected.
+    Transient database lock errors are retried with jittered backoff.
+    Watchers of the listing are notified once the bid commits. Returns
+    the new Bid.
+    """
+    for attempt in range(retries):
+        try:
+            with transaction.atomic():
+                updated = (
+                    Listing.objects
+                    .filter(pk=listing_id, active=True, current_price__lt=amount)
+                    .filter(Q(ends_at__isnull=True) | Q(ends_at__gt=timezone.now()))
+                    .exclude(creator=user)
+                    .update(current_price=amount, bid_count=F('bid_count') + 1)
+                )
+                if not updated:
+                    raise BidRejected(_rejection_message(listing_id, user, amount))
+                bid = Bid.objects.create(user=user, listing_id=listing_id, amount=amount)
+                Listing.objects.filter(pk=listing_id).update(highest_bid=bid)
+                events.publish_listing(listing_id)
+                return bid
+        except OperationalError as e:
+            if 'locked' not in str(e) or attempt == retries - 1:
+                raise
+            time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import queue
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import Listing
+
+
+class InProcessBroker:
+    """
+    Publish/subscribe within a single process. Each subscriber gets a
+    bounded queue; events for a subscriber that falls behind are
+    dropped, which is safe because every event carries the listing's
+    full state.
+    
+    subscribe() returns a thread-safe queue.Queue for synchronous
+    consumers; subscribe_async() returns an asyncio.Queue on the running
+    event loop, fed from any thread with call_soon_threadsafe.
+    
+    Any class with the same methods can be configured as
+    AUCTIONS_EVENT_BROKER, e.g. one backed by a local message broker
+    for multi-process deployments.
+    """
+
+    def __init__(self, max_queue_size=100):
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        # channel -> {subscription queue: its event loop, or None}
+        self._subscribers = defaultdict(dict)
+
+    def subscribe(self, channel):
+        subscription = queue.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers[channel][subscription] = None
+        return subscription
+
+    def subscribe_async(self, channel):
+        subscription = asyncio.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers[channel][subscription] = asyncio.get_running_loop()
+        return subscription
+
+    def unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.pop(subscription, None)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, {}).items())
+        for subscription, loop in subscribers:
+            if loop is None:
+                _put_nowait(subscription, event)
+            else:
+                try:
+                    loop.call_soon_threadsafe(_put_nowait, subscription, event)
+                except RuntimeError:
+                    # The subscriber's event loop has closed
+                    pass
+
+
+def _put_nowait(subscription, event):
+    try:
+        subscription.put_nowait(event)
+    except (queue.Full, asyncio.QueueFull):
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """Return the process-wide broker configured by AUCTIONS_EVENT_BROKER"""
+    path = getattr(settings, 'AUCTIONS_EVENT_BROKER', 'auctions.events.InProcessBroker')
+    return import_string(path)()
+
+
+def listing_channel(listing_id):
+    return f"listing-{listing_id}"
+
+
+def listing_state(listing_id):
+    """Return the bid-related state of a listing as a JSON-ready dict"""
+    listing = (
+        Listing.objects.filter(pk=listing_id)
+        .values('current_price', 'bid_count', 'active', 'highest_bid__user__username')
+        .first()
+    )
+    if listing is None:
+        return None
+    return {
+        "listing_id": listing_id,
+        "current_price": str(listing['current_price']),
+        "bid_count": listing['bid_count'],
+        "active": listing['active'],
+        "highest_bidder": listing['highest_bid__user__username'],
+    }
+
+
+def publish_listing(listing_id):
+    """Push the listing's state to subscribers once the current transaction commits"""
+    def publish():
+        state = listing_state(listing_id)
+        if state is not None:
+            get_broker().publish(listing_channel(listing_id), state)
+    transaction.on_commit(publish)
+
+
+def format_sse(event, data, event_id=None):
+    """Encode one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Bid, Listing
+
+
+def close_listings(queryset):
+    """
+    Close the active listings in queryset and settle their winners in a
+    single UPDATE, taking each winner from the denormalized highest_bid.
+    Returns the number of listings closed.
+    """
+    winner = Bid.objects.filter(pk=OuterRef('highest_bid')).values('user')[:1]
+    return queryset.filter(active=True).update(active=False, winner=Subquery(winner))
+
+
+def close_expired(now=None, batch_size=500):
+    """
+    Close every active listing whose end time has passed, batch_size
+    listings per transaction. Each batch is one indexed SELECT of ids
+    and one UPDATE, so no listing is loaded or saved individually.
+    Returns the number of listings closed.
+    """
+    now = now or timezone.now()
+    expired = Listing.objects.filter(active=True, ends_at__lte=now).order_by('ends_at')
+    closed = 0
+    while True:
+        with transaction.atomic():
+            ids = list(expired.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return closed
+            closed += close_listings(Listing.objects.filter(pk__in=ids, ends_at__lte=now))
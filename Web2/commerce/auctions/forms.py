@@ -45,6 +45,21 @@ class ListingForm(forms.Form):
             'class': 'form-control'
         })
     )
+    duration = forms.TypedChoiceField(
+        choices=[
+            ('', "No end date"),
+            (1, "1 day"),
+            (3, "3 days"),
+            (7, "7 days"),
+            (14, "14 days"),
+        ],
+        coerce=int,
+        empty_value=None,
+        required=False,
+        widget=forms.Select(attrs={
+            'class': 'form-control'
+        })
+    )
 
     def clean_starting_bid(self):
         starting_bid = self.cleaned_data['starting_bid']
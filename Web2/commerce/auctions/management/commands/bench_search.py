@@ -0,0 +1,80 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, teardown_databases
+
+from auctions import search
+from auctions.models import User, Category, Listing
+
+
+WORDS = (
+    "vintage antique modern rare signed limited edition classic retro handmade "
+    "wooden leather silver gold brass ceramic glass camera lens guitar amplifier "
+    "vinyl record poster print painting sculpture watch clock lamp chair table "
+    "desk bicycle helmet jacket boots bag wallet ring necklace book comic card "
+    "console controller keyboard monitor speaker radio phone tablet drone kit"
+).split()
+
+
+class Command(BaseCommand):
+    help = ("Benchmark listing search with facets on a synthetic corpus. "
+            "Runs against a temporary test database, not the configured one.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--listings", type=int, default=500000)
+        parser.add_argument("--queries", type=int, default=500)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            start = time.perf_counter()
+            self.populate(rng, options["listings"])
+            self.stdout.write(f"Created {options['listings']} listings in {time.perf_counter() - start:.1f}s")
+
+            categories = list(Category.objects.values_list('id', flat=True))
+            timings = []
+            for _ in range(options["queries"]):
+                query = " ".join(rng.sample(WORDS, rng.randint(1, 2)))
+                price_range = rng.choice(search.PRICE_RANGES + [(None, None, None)])
+                start = time.perf_counter()
+                result = search.search_listings(
+                    query,
+                    category_id=rng.choice(categories + [None]),
+                    min_price=price_range[1],
+                    max_price=price_range[2],
+                    status=rng.choice(search.STATUSES)
+                )
+                list(result["results"])
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        timings.sort()
+        self.stdout.write(
+            f"{len(timings)} searches with facets: "
+            f"p50 {timings[len(timings) // 2]:.1f} ms, "
+            f"p99 {timings[int(len(timings) * 0.99)]:.1f} ms, "
+            f"max {timings[-1]:.1f} ms"
+        )
+
+    def populate(self, rng, count, batch_size=5000):
+        user = User.objects.create_user('bench', 'bench@example.com', 'password')
+        categories = [Category.objects.create(name=f"Category {i}") for i in range(20)]
+        for offset in range(0, count, batch_size):
+            batch = []
+            for _ in range(min(batch_size, count - offset)):
+                price = Decimal(rng.randint(100, 100000)) / 100
+                batch.append(Listing(
+                    title=" ".join(rng.choices(WORDS, k=rng.randint(2, 5))),
+                    description=" ".join(rng.choices(WORDS, k=rng.randint(10, 40))),
+                    starting_bid=price,
+                    current_price=price,
+                    category=rng.choice(categories),
+                    creator=user,
+                    active=rng.random() < 0.8
+                ))
+            Listing.objects.bulk_create(batch)
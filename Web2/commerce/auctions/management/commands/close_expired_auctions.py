@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from auctions import expiry
+
+
+class Command(BaseCommand):
+    help = "Close auctions whose end time has passed and settle their winners."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Listings closed per transaction (default 500).")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running, checking for expired auctions every --interval seconds.")
+        parser.add_argument('--interval', type=float, default=10,
+                            help="Seconds between checks with --loop (default 10).")
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.perf_counter()
+            closed = expiry.close_expired(batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - start
+            if closed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Closed {closed} expired auctions in {elapsed:.2f}s."
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
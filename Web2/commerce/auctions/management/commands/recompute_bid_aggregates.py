@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from auctions.models import Bid, Listing
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized bid_count and highest_bid of every listing."
+
+    def handle(self, *args, **options):
+        bids = Bid.objects.filter(listing=OuterRef('pk'))
+        with transaction.atomic():
+            updated = Listing.objects.update(
+                bid_count=Coalesce(Subquery(
+                    bids.order_by().values('listing').annotate(count=Count('pk')).values('count')
+                ), 0),
+                highest_bid=Subquery(bids.order_by('-amount', '-created_at').values('pk')[:1]),
+            )
+        self.stdout.write(self.style.SUCCESS(f"Recomputed bid aggregates for {updated} listings."))
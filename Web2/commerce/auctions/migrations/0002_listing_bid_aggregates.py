@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_bid_aggregates(apps, schema_editor):
+    Bid = apps.get_model('auctions', 'Bid')
+    Listing = apps.get_model('auctions', 'Listing')
+    bids = Bid.objects.filter(listing=OuterRef('pk'))
+    Listing.objects.update(
+        bid_count=Coalesce(Subquery(
+            bids.order_by().values('listing').annotate(count=Count('pk')).values('count')
+        ), 0),
+        highest_bid=Subquery(bids.order_by('-amount', '-created_at').values('pk')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='bid_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='highest_bid',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='auctions.bid'),
+        ),
+        migrations.RunPython(backfill_bid_aggregates, migrations.RunPython.noop),
+    ]
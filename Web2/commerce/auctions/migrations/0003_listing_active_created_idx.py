@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0002_listing_bid_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['active', 'created_at', 'id'], name='listing_active_created_idx'),
+        ),
+    ]
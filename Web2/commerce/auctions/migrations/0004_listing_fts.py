@@ -0,0 +1,51 @@
+from django.db import migrations
+
+
+# Full-text index over listing titles and descriptions, kept in sync by
+# triggers. Updates that only touch bid or status columns skip the index.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE listing_fts USING fts5(
+        title, description, content='auctions_listing', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER listing_fts_insert AFTER INSERT ON auctions_listing BEGIN
+        INSERT INTO listing_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER listing_fts_delete AFTER DELETE ON auctions_listing BEGIN
+        INSERT INTO listing_fts(listing_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER listing_fts_update AFTER UPDATE OF title, description ON auctions_listing BEGIN
+        INSERT INTO listing_fts(listing_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO listing_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO listing_fts(listing_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS listing_fts_update",
+    "DROP TRIGGER IF EXISTS listing_fts_delete",
+    "DROP TRIGGER IF EXISTS listing_fts_insert",
+    "DROP TABLE IF EXISTS listing_fts",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0003_listing_active_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_FTS, DROP_FTS),
+    ]
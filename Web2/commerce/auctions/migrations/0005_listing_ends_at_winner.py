@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0004_listing_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='winner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='won_listings', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['active', 'ends_at'], name='listing_active_ends_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0005_listing_ends_at_winner'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['listing', 'created_at', 'id'], name='bid_listing_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['listing', 'created_at', 'id'], name='comment_listing_created_idx'),
+        ),
+    ]
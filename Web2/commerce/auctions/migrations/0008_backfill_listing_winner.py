@@ -0,0 +1,26 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def settle_winners(apps, schema_editor):
+    """
+    Record the winner of listings closed before winners were stored,
+    taken from each listing's highest bid as close_listings does.
+    """
+    Bid = apps.get_model("auctions", "Bid")
+    Listing = apps.get_model("auctions", "Listing")
+    winner = Bid.objects.filter(pk=OuterRef("highest_bid")).values("user")[:1]
+    Listing.objects.filter(active=False, winner__isnull=True, highest_bid__isnull=False).update(
+        winner=Subquery(winner)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0007_user_watchlist_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(settle_winners, migrations.RunPython.noop),
+    ]
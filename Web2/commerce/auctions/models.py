@@ -5,7 +5,9 @@ from decimal import Decimal
 
 
 class User(AbstractUser):
-    pass
+    # Bumped whenever the user's watchlist changes. It versions the cached
+    # watchlist, so every worker sees the change on its next request
+    watchlist_version = models.PositiveIntegerField(default=0)
 
 
 class Category(models.Model):
@@ -46,26 +48,44 @@ class Listing(models.Model):
     )
     active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    ends_at = models.DateTimeField(blank=True, null=True)
+    winner = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='won_listings'
+    )
+    # Denormalized bid aggregates, maintained by place_bid and
+    # recomputed by the recompute_bid_aggregates command
+    bid_count = models.PositiveIntegerField(default=0)
+    highest_bid = models.ForeignKey(
+        'Bid',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Serves the keyset-paginated active listings index
+            models.Index(fields=['active', 'created_at', 'id'], name='listing_active_created_idx'),
+            # Serves the scan for expired auctions
+            models.Index(fields=['active', 'ends_at'], name='listing_active_ends_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - ${self.current_price}"
     
     def get_highest_bid(self):
         """Return the highest bid for this listing"""
-        return self.bids.order_by('-amount').first()
+        return self.highest_bid
     
     def get_bid_count(self):
         """Return the number of bids on this listing"""
-        return self.bids.count()
-    
-    def is_watched_by(self, user):
-        """Check if listing is watched by a specific user"""
-        if user.is_authenticated:
-            return self.watchers.filter(user=user).exists()
-        return False
+        return self.bid_count
 
 
 class Bid(models.Model):
@@ -89,6 +109,10 @@ class Bid(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = [['user', 'listing', 'amount']]
+        indexes = [
+            # Serves the keyset-paginated bid history of a listing
+            models.Index(fields=['listing', 'created_at', 'id'], name='bid_listing_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} bid ${self.amount} on {self.listing.title}"
@@ -110,6 +134,10 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Serves the keyset-paginated comments of a listing
+            models.Index(fields=['listing', 'created_at', 'id'], name='comment_listing_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} commented on {self.listing.title}"
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+def encode_cursor(created_at, pk):
+    """Encode a (created_at, id) position as an opaque URL-safe cursor"""
+    return urlsafe_base64_encode(f"{created_at.isoformat()}|{pk}".encode())
+
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor(), or return None if it is invalid"""
+    try:
+        created_at, pk = urlsafe_base64_decode(cursor).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, page_size=24):
+    """
+    Return one page of queryset, newest first, and the cursor of the next
+    page (None on the last page).
+    
+    Pages are located by seeking past the last (created_at, id) seen
+    rather than by OFFSET, so each page costs the same however deep it is.
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    items = list(queryset[:page_size + 1])
+    if len(items) > page_size:
+        items = items[:page_size]
+        return items, encode_cursor(items[-1].created_at, items[-1].pk)
+    return items, None
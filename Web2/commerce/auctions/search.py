@@ -0,0 +1,158 @@
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Listing
+from .pagination import keyset_page
+
+
+# Price facet buckets as (label, minimum, maximum); the maximum is exclusive
+PRICE_RANGES = [
+    ("Under $10", None, Decimal('10')),
+    ("$10 to $50", Decimal('10'), Decimal('50')),
+    ("$50 to $100", Decimal('50'), Decimal('100')),
+    ("$100 to $500", Decimal('100'), Decimal('500')),
+    ("$500 and up", Decimal('500'), None),
+]
+
+STATUSES = ("active", "ended", "all")
+
+# Seconds facet counts for a search without text are cached. Those
+# counts group the whole table, which is too slow to repeat per request
+EMPTY_QUERY_FACETS_TIMEOUT = 60
+
+
+def parse_price(value):
+    """Return value as a finite Decimal, or None if it is empty or invalid"""
+    try:
+        price = Decimal(value) if value else None
+    except InvalidOperation:
+        return None
+    return price if price is not None and price.is_finite() else None
+
+
+def match_expression(query):
+    """
+    Turn free text into an FTS5 query that requires every word, with
+    prefix matching on the last one so partial words still match.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _price_filter(min_price, max_price):
+    condition = Q()
+    if min_price is not None:
+        condition &= Q(current_price__gte=min_price)
+    if max_price is not None:
+        condition &= Q(current_price__lt=max_price)
+    return condition
+
+
+def _status_filter(status):
+    if status == "active":
+        return Q(active=True)
+    if status == "ended":
+        return Q(active=False)
+    return Q()
+
+
+def search_listings(query="", category_id=None, min_price=None, max_price=None,
+                    status="active", cursor=None, page_size=24):
+    """
+    Search listings by title and description and return one page of
+    results, newest first, together with facet counts.
+    
+    Each facet is counted over the text match and the other facets'
+    filters, so its counts show what choosing a value would return.
+    A search costs two queries: one for the page of results and one for
+    every facet count. Without text the facet counts cover the whole
+    table, so they are cached for EMPTY_QUERY_FACETS_TIMEOUT seconds.
+    """
+    listings = Listing.objects.all()
+    match = match_expression(query)
+    if match:
+        listings = listings.filter(
+            id__in=RawSQL("SELECT rowid FROM listing_fts WHERE listing_fts MATCH %s", [match])
+        )
+
+    by_category = Q(category_id=category_id) if category_id else Q()
+    by_price = _price_filter(min_price, max_price)
+    by_status = _status_filter(status)
+
+    results, next_cursor = keyset_page(
+        listings.filter(by_category, by_price, by_status).select_related('creator', 'category'),
+        cursor,
+        page_size
+    )
+
+    if match:
+        facets = _facet_counts(listings, category_id, min_price, max_price, status)
+    else:
+        key = f"auctions:search_facets:{category_id}:{min_price}:{max_price}:{status}"
+        facets = cache.get(key)
+        if facets is None:
+            facets = _facet_counts(listings, category_id, min_price, max_price, status)
+            cache.set(key, facets, EMPTY_QUERY_FACETS_TIMEOUT)
+
+    return {
+        "results": results,
+        "next_cursor": next_cursor,
+        "facets": facets,
+    }
+
+
+def _facet_counts(listings, category_id, min_price, max_price, status):
+    """Count every facet over listings in one grouped query"""
+    by_price = _price_filter(min_price, max_price)
+    by_status = _status_filter(status)
+
+    # All facet counts come from one pass over the text match, grouped
+    # by category; price and status counts are summed over the
+    # categories that pass the category filter
+    price_counts = {
+        f"price_{i}": Count('id', filter=_price_filter(low, high) & by_status)
+        for i, (_, low, high) in enumerate(PRICE_RANGES)
+    }
+    rows = (
+        listings.values('category_id', 'category__name')
+        .annotate(
+            count=Count('id', filter=by_price & by_status),
+            active_count=Count('id', filter=by_price & Q(active=True)),
+            ended_count=Count('id', filter=by_price & Q(active=False)),
+            **price_counts
+        )
+        .order_by('category__name')
+    )
+    category_counts = []
+    totals = dict.fromkeys(["active_count", "ended_count", *price_counts], 0)
+    for row in rows:
+        if row['category_id'] is not None and row['count']:
+            category_counts.append(row)
+        if not category_id or row['category_id'] == category_id:
+            for key in totals:
+                totals[key] += row[key]
+    status_counts = {
+        "active": totals["active_count"],
+        "ended": totals["ended_count"],
+        "all": totals["active_count"] + totals["ended_count"],
+    }
+
+    return {
+        "category": [
+            {"id": row['category_id'], "name": row['category__name'], "count": row['count']}
+            for row in category_counts
+        ],
+        "price": [
+            {"label": label, "min": low, "max": high, "count": totals[f"price_{i}"]}
+            for i, (label, low, high) in enumerate(PRICE_RANGES)
+        ],
+        "status": [{"value": value, "count": status_counts[value]} for value in STATUSES],
+    }
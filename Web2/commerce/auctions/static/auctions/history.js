@@ -0,0 +1,68 @@
+document.addEventListener('DOMContentLoaded', function() {
+
+  // Build the markup for one bid or comment, matching the server-rendered page
+  function render(kind, item) {
+    const when = new Date(item.created_at).toLocaleString();
+    const fragment = document.createDocumentFragment();
+    fragment.append(document.createElement('hr'));
+
+    if (kind === 'bids') {
+      fragment.lastChild.className = 'my-2';
+      const row = document.createElement('div');
+      row.className = 'd-flex justify-content-between';
+      const user = document.createElement('span');
+      user.textContent = item.user;
+      const amount = document.createElement('span');
+      amount.className = 'text-success';
+      amount.textContent = `$${item.amount}`;
+      row.append(user, amount);
+      const time = document.createElement('small');
+      time.className = 'text-muted';
+      time.textContent = when;
+      fragment.append(row, time);
+    } else {
+      const media = document.createElement('div');
+      media.className = 'media mb-3';
+      const body = document.createElement('div');
+      body.className = 'media-body';
+      const user = document.createElement('h6');
+      user.className = 'mt-0';
+      user.textContent = item.user;
+      const time = document.createElement('small');
+      time.className = 'text-muted';
+      time.textContent = when;
+      const content = document.createElement('p');
+      content.className = 'mt-2';
+      content.style.whiteSpace = 'pre-line';
+      content.textContent = item.content;
+      body.append(user, time, content);
+      media.append(body);
+      fragment.append(media);
+    }
+    return fragment;
+  }
+
+  // Fetch the next page of history each time a "Show older" button is clicked
+  document.querySelectorAll('.load-history').forEach(button => {
+    button.addEventListener('click', () => {
+      button.disabled = true;
+      fetch(`${button.dataset.url}?cursor=${encodeURIComponent(button.dataset.cursor)}`)
+      .then(response => response.json())
+      .then(page => {
+        const target = document.querySelector(button.dataset.target);
+        page[button.dataset.kind].forEach(item => {
+          target.append(render(button.dataset.kind, item));
+        });
+        if (page.cursor) {
+          button.dataset.cursor = page.cursor;
+          button.disabled = false;
+        } else {
+          button.remove();
+        }
+      })
+      .catch(() => {
+        button.disabled = false;
+      });
+    });
+  });
+});
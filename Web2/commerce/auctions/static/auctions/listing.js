@@ -0,0 +1,33 @@
+document.addEventListener('DOMContentLoaded', function() {
+
+  const card = document.querySelector('#price-card');
+  if (!card || !window.EventSource) {
+    return;
+  }
+
+  // Receive price and bid updates pushed by the server
+  const source = new EventSource(card.dataset.eventsUrl);
+  source.addEventListener('listing', event => {
+    const state = JSON.parse(event.data);
+
+    document.querySelector('#current-price').textContent = `$${state.current_price}`;
+    if (state.bid_count > 0) {
+      document.querySelector('#bid-count').textContent =
+        `${state.bid_count} bid${state.bid_count === 1 ? '' : 's'}`;
+      document.querySelector('#bid-status').textContent = `Highest bid by ${state.highest_bidder}`;
+    }
+
+    // Raise the minimum accepted by the bid form
+    const input = document.querySelector('#bid_amount');
+    if (input) {
+      const minimum = (parseFloat(state.current_price) + 0.01).toFixed(2);
+      input.min = minimum;
+      input.placeholder = minimum;
+    }
+
+    if (!state.active) {
+      source.close();
+      window.location.reload();
+    }
+  });
+});
@@ -1,3 +1,143 @@
-from django.test import TestCase
+import random
+import threading
+from decimal import Decimal
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from . import bidding, search
+from .models import User, Category, Listing, Bid
+
+
+class CategoriesQueryCountTests(TestCase):
+    """The categories page must not issue queries per category."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('seller', 'seller@example.com', 'password')
+
+    def create_categories(self, count):
+        for i in range(Category.objects.count(), count):
+            category = Category.objects.create(name=f"Category {i}")
+            for active in (True, True, False):
+                Listing.objects.create(
+                    title=f"Listing in {category.name}",
+                    description="Description",
+                    starting_bid=Decimal('1.00'),
+                    current_price=Decimal('1.00'),
+                    category=category,
+                    creator=self.user,
+                    active=active
+                )
+
+    def test_query_count_is_constant(self):
+        self.create_categories(2)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('categories'))
+
+        self.create_categories(20)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('categories'))
+
+        self.assertEqual(len(response.context['categories']), 20)
+        self.assertEqual(response.context['total_active_listings'], 40)
+        self.assertEqual(response.context['total_listings'], 60)
+
+    def test_counts_and_recent_listing(self):
+        self.create_categories(1)
+        category = Category.objects.get()
+        newest = Listing.objects.filter(category=category, active=True).order_by('-created_at').first()
+
+        response = self.client.get(reverse('categories'))
+
+        annotated = response.context['categories'][0]
+        self.assertEqual(annotated.active_listings_count, 2)
+        self.assertEqual(annotated.total_listings_count, 3)
+        self.assertEqual(annotated.recent_listing, newest)
+        self.assertEqual(response.context['most_active_category'], annotated)
+
+
+class SearchTests(TestCase):
+    """Search must reject malformed filters instead of failing."""
+
+    def test_parse_price_rejects_non_finite_values(self):
+        for value in ("NaN", "-nan", "sNaN", "Infinity", "-Infinity", "inf", "abc", ""):
+            with self.subTest(value=value):
+                self.assertIsNone(search.parse_price(value))
+        self.assertEqual(search.parse_price("12.50"), Decimal('12.50'))
+
+    def test_non_finite_price_filter_is_ignored(self):
+        for value in ("NaN", "Infinity", "sNaN"):
+            with self.subTest(value=value):
+                response = self.client.get(reverse('search'), {'min_price': value, 'max_price': value})
+                self.assertEqual(response.status_code, 200)
+
+
+class ConcurrentBiddingTests(TransactionTestCase):
+    """Load test: many threads bidding on one hot listing lose no updates."""
+
+    THREADS = 8
+    BIDS_PER_THREAD = 40
+
+    def setUp(self):
+        self.seller = User.objects.create_user('seller', 'seller@example.com', 'password')
+        self.bidders = [
+            User.objects.create_user(f'bidder{i}', f'bidder{i}@example.com', 'password')
+            for i in range(self.THREADS)
+        ]
+        self.listing = Listing.objects.create(
+            title="Hot listing",
+            description="Everyone wants this",
+            starting_bid=Decimal('1.00'),
+            current_price=Decimal('1.00'),
+            creator=self.seller
+        )
+
+    def bid_repeatedly(self, user, accepted, rejected):
+        rng = random.Random(user.id)
+        try:
+            for _ in range(self.BIDS_PER_THREAD):
+                price = Listing.objects.values_list('current_price', flat=True).get(pk=self.listing.pk)
+                amount = price + Decimal(rng.randint(1, 100)) / 100
+                try:
+                    bid = bidding.place_bid(self.listing.pk, user, amount)
+                except bidding.BidRejected:
+                    rejected.append(amount)
+                else:
+                    accepted.append(bid)
+        finally:
+            connection.close()
+
+    def test_no_lost_updates(self):
+        accepted, rejected = [], []
+        threads = [
+            threading.Thread(target=self.bid_repeatedly, args=(user, accepted, rejected))
+            for user in self.bidders
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        listing = Listing.objects.get(pk=self.listing.pk)
+        bids = list(Bid.objects.filter(listing=listing).order_by('id'))
+        self.assertEqual(len(accepted) + len(rejected), self.THREADS * self.BIDS_PER_THREAD)
+        self.assertEqual(len(bids), len(accepted))
+        self.assertEqual(listing.bid_count, len(bids))
+        self.assertEqual(listing.current_price, bids[-1].amount)
+        self.assertEqual(listing.highest_bid_id, bids[-1].id)
+
+        # Every accepted bid outbid the one accepted before it
+        amounts = [bid.amount for bid in bids]
+        self.assertEqual(amounts, sorted(set(amounts)))
+
+    def test_rejects_bid_on_closed_listing(self):
+        Listing.objects.filter(pk=self.listing.pk).update(active=False)
+        with self.assertRaisesMessage(bidding.BidRejected, "no longer active"):
+            bidding.place_bid(self.listing.pk, self.bidders[0], Decimal('5.00'))
+        self.assertFalse(Bid.objects.exists())
+
+    def test_rejects_bid_on_own_listing(self):
+        with self.assertRaisesMessage(bidding.BidRejected, "your own listing"):
+            bidding.place_bid(self.listing.pk, self.seller, Decimal('5.00'))
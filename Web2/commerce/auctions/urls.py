@@ -7,10 +7,14 @@ urlpatterns = [
     path("login", views.login_view, name="login"),
     path("logout", views.logout_view, name="logout"),
     path("register", views.register, name="register"),
+    path("search", views.search, name="search"),
     
     # Listing URLs
     path("create", views.create_listing, name="create_listing"),
     path("listing/<int:listing_id>", views.listing_detail, name="listing_detail"),
+    path("listing/<int:listing_id>/events", views.listing_events, name="listing_events"),
+    path("listing/<int:listing_id>/bids", views.listing_bids, name="listing_bids"),
+    path("listing/<int:listing_id>/comments", views.listing_comments, name="listing_comments"),
     path("close/<int:listing_id>", views.close_auction, name="close_auction"),
     
     # Watchlist URLs
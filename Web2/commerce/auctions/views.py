@@ -1,21 +1,92 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.db import IntegrityError
-from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib import messages
-from django.db.models import Max
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from datetime import timedelta
 from decimal import Decimal
+import asyncio
+import queue
+import threading
+import time
 
 from .models import User, Listing, Bid, Comment, Category, Watchlist
 from .forms import ListingForm, BidForm, CommentForm
+from . import bidding, events, expiry, search as listing_search, watching
+from .pagination import keyset_page
+
+
+LISTINGS_PER_PAGE = 24
 
 
 def index(request):
-    active_listings = Listing.objects.filter(active=True).order_by('-created_at')
+    cursor = request.GET.get('cursor')
+    active_listings, next_cursor = keyset_page(
+        Listing.objects.filter(active=True).select_related('creator', 'category'),
+        cursor,
+        LISTINGS_PER_PAGE
+    )
     return render(request, "auctions/index.html", {
-        "listings": active_listings
+        "listings": active_listings,
+        "next_cursor": next_cursor,
+        "is_first_page": not cursor
+    })
+
+
+def search(request):
+    """Full-text listing search with category, price and status facets"""
+    params = request.GET
+    query = params.get('q', '').strip()
+    try:
+        category_id = int(params.get('category', ''))
+    except ValueError:
+        category_id = None
+    min_price = listing_search.parse_price(params.get('min_price'))
+    max_price = listing_search.parse_price(params.get('max_price'))
+    status = params.get('status') if params.get('status') in listing_search.STATUSES else 'active'
+    
+    result = listing_search.search_listings(
+        query, category_id, min_price, max_price, status,
+        cursor=params.get('cursor'), page_size=LISTINGS_PER_PAGE
+    )
+    
+    def facet_url(**changes):
+        """Current search URL with some parameters replaced or removed"""
+        updated = params.copy()
+        updated.pop('cursor', None)
+        for key, value in changes.items():
+            if value is None:
+                updated.pop(key, None)
+            else:
+                updated[key] = value
+        return f"{reverse('search')}?{updated.urlencode()}"
+    
+    facets = result['facets']
+    for option in facets['category']:
+        option['selected'] = option['id'] == category_id
+        option['url'] = facet_url(category=None if option['selected'] else str(option['id']))
+    for option in facets['price']:
+        option['selected'] = (option['min'], option['max']) == (min_price, max_price)
+        option['url'] = facet_url(
+            min_price=None if option['selected'] or option['min'] is None else str(option['min']),
+            max_price=None if option['selected'] or option['max'] is None else str(option['max'])
+        )
+    for option in facets['status']:
+        option['selected'] = option['value'] == status
+        option['url'] = facet_url(status=option['value'])
+    
+    return render(request, "auctions/search.html", {
+        "query": query,
+        "listings": result['results'],
+        "facets": facets,
+        "next_url": result['next_cursor'] and facet_url(cursor=result['next_cursor'])
     })
 
 
@@ -77,6 +148,9 @@ def create_listing(request):
     if request.method == "POST":
         form = ListingForm(request.POST)
         if form.is_valid():
+            duration = form.cleaned_data['duration']
+            ends_at = timezone.now() + timedelta(days=duration) if duration else None
+            
             # Create new listing
             listing = Listing.objects.create(
                 title=form.cleaned_data['title'],
@@ -85,7 +159,8 @@ def create_listing(request):
                 current_price=form.cleaned_data['starting_bid'],
                 image_url=form.cleaned_data['image_url'],
                 category=form.cleaned_data['category'],
-                creator=request.user
+                creator=request.user,
+                ends_at=ends_at
             )
             messages.success(request, "Your listing has been created successfully!")
             return redirect('listing_detail', listing_id=listing.id)
@@ -98,9 +173,16 @@ def create_listing(request):
     })
 
 
+# Bids and comments shown per page of listing history
+HISTORY_PER_PAGE = 10
+
+
 def listing_detail(request, listing_id):
     """Show individual listing with bid/comment/watchlist functionality"""
-    listing = get_object_or_404(Listing, id=listing_id)
+    listing = get_object_or_404(
+        Listing.objects.select_related('creator', 'category', 'highest_bid__user', 'winner'),
+        id=listing_id
+    )
     
     # Get forms for authenticated users
     bid_form = None
@@ -110,24 +192,32 @@ def listing_detail(request, listing_id):
     if request.user.is_authenticated:
         bid_form = BidForm(listing=listing)
         comment_form = CommentForm()
-        is_watched = listing.is_watched_by(request.user)
+        is_watched = bool(watching.watched_ids(request.user, [listing.id]))
     
-    # Get comments and bids
-    comments = listing.comments.all()
-    bids = listing.bids.all()
+    # Only the newest page of history is rendered; older pages load on demand
+    comments, comments_cursor = keyset_page(
+        listing.comments.select_related('user'), page_size=HISTORY_PER_PAGE
+    )
+    bids, bids_cursor = keyset_page(
+        listing.bids.select_related('user'), page_size=HISTORY_PER_PAGE
+    )
     highest_bid = listing.get_highest_bid()
     
-    # Check if current user is the winner (if auction is closed)
-    is_winner = False
-    if not listing.active and highest_bid and request.user.is_authenticated:
-        is_winner = highest_bid.user == request.user
+    # Check if current user is the winner settled when the auction closed
+    is_winner = (
+        not listing.active
+        and request.user.is_authenticated
+        and listing.winner_id == request.user.id
+    )
     
     return render(request, "auctions/listing_detail.html", {
         "listing": listing,
         "bid_form": bid_form,
         "comment_form": comment_form,
         "comments": comments,
+        "comments_cursor": comments_cursor,
         "bids": bids,
+        "bids_cursor": bids_cursor,
         "highest_bid": highest_bid,
         "is_watched": is_watched,
         "is_winner": is_winner,
@@ -135,40 +225,199 @@ def listing_detail(request, listing_id):
     })
 
 
+def listing_bids(request, listing_id):
+    """Return one page of a listing's bid history as JSON, newest first"""
+    get_object_or_404(Listing.objects.only('id'), id=listing_id)
+    bids, cursor = keyset_page(
+        Bid.objects.filter(listing_id=listing_id).select_related('user'),
+        request.GET.get('cursor'),
+        page_size=HISTORY_PER_PAGE
+    )
+    return JsonResponse({
+        "bids": [
+            {
+                "id": bid.id,
+                "user": bid.user.username,
+                "amount": str(bid.amount),
+                "created_at": bid.created_at.isoformat()
+            }
+            for bid in bids
+        ],
+        "cursor": cursor
+    })
+
+
+def listing_comments(request, listing_id):
+    """Return one page of a listing's comments as JSON, newest first"""
+    get_object_or_404(Listing.objects.only('id'), id=listing_id)
+    comments, cursor = keyset_page(
+        Comment.objects.filter(listing_id=listing_id).select_related('user'),
+        request.GET.get('cursor'),
+        page_size=HISTORY_PER_PAGE
+    )
+    return JsonResponse({
+        "comments": [
+            {
+                "id": comment.id,
+                "user": comment.user.username,
+                "content": comment.content,
+                "created_at": comment.created_at.isoformat()
+            }
+            for comment in comments
+        ],
+        "cursor": cursor
+    })
+
+
+# How long one event stream stays open; EventSource reconnects afterwards
+EVENT_STREAM_SECONDS = 300
+EVENT_KEEPALIVE_SECONDS = 15
+# Under WSGI every open stream holds a worker thread, so each process
+# serves at most this many; further clients get the current state and
+# are told to reconnect after EVENT_RETRY_MILLISECONDS
+MAX_SYNC_EVENT_STREAMS = getattr(settings, 'AUCTIONS_MAX_SYNC_EVENT_STREAMS', 8)
+EVENT_RETRY_MILLISECONDS = 30 * 1000
+
+_sync_event_streams = threading.BoundedSemaphore(MAX_SYNC_EVENT_STREAMS)
+
+
+def listing_events(request, listing_id):
+    """
+    Stream bid and price changes for a listing as Server-Sent Events.
+    Under ASGI the stream is an async generator that holds no thread
+    while it waits; under WSGI it falls back to a blocking generator,
+    capped at MAX_SYNC_EVENT_STREAMS per process.
+    """
+    get_object_or_404(Listing.objects.only('id'), id=listing_id)
+    
+    if isinstance(request, ASGIRequest):
+        stream = _async_listing_stream(listing_id)
+    else:
+        stream = _sync_listing_stream(listing_id)
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _async_listing_stream(listing_id):
+    broker = events.get_broker()
+    channel = events.listing_channel(listing_id)
+    # Subscribe before reading the initial state so no bid is missed
+    subscription = broker.subscribe_async(channel)
+    try:
+        state = await sync_to_async(events.listing_state)(listing_id)
+        yield events.format_sse("listing", state, state['bid_count'])
+        deadline = time.monotonic() + EVENT_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                state = await asyncio.wait_for(subscription.get(), EVENT_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield events.format_sse("listing", state, state['bid_count'])
+    finally:
+        broker.unsubscribe(channel, subscription)
+
+
+def _sync_listing_stream(listing_id):
+    # Past the cap, send the current state and have the client retry later
+    if not _sync_event_streams.acquire(blocking=False):
+        state = events.listing_state(listing_id)
+        yield f"retry: {EVENT_RETRY_MILLISECONDS}\n\n"
+        yield events.format_sse("listing", state, state['bid_count'])
+        return
+    
+    broker = events.get_broker()
+    channel = events.listing_channel(listing_id)
+    subscription = broker.subscribe(channel)
+    try:
+        state = events.listing_state(listing_id)
+        yield events.format_sse("listing", state, state['bid_count'])
+        deadline = time.monotonic() + EVENT_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                state = subscription.get(timeout=EVENT_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield events.format_sse("listing", state, state['bid_count'])
+    finally:
+        broker.unsubscribe(channel, subscription)
+        _sync_event_streams.release()
+
+
 @login_required
 def watchlist(request):
     """Show user's watchlist"""
-    watchlist_items = Watchlist.objects.filter(user=request.user).select_related('listing')
+    watchlist_items = list(
+        Watchlist.objects.filter(user=request.user)
+        .select_related('listing__category', 'listing__highest_bid')
+    )
+    
+    # Summary counts from the denormalized bid aggregates
+    active_count = winning_count = won_count = 0
+    for item in watchlist_items:
+        if item.listing.active:
+            highest_bid = item.listing.highest_bid
+            active_count += 1
+            winning_count += highest_bid is not None and highest_bid.user_id == request.user.id
+        else:
+            won_count += item.listing.winner_id == request.user.id
+    
     return render(request, "auctions/watchlist.html", {
-        "watchlist_items": watchlist_items
+        "watchlist_items": watchlist_items,
+        "active_count": active_count,
+        "winning_count": winning_count,
+        "won_count": won_count
     })
 
 
 def categories(request):
     """Show all categories"""
-    categories_list = Category.objects.all().order_by('name')
+    # Listing counts and the most recent active listing id come from a
+    # single aggregate query
+    recent_active = Listing.objects.filter(category=OuterRef('pk'), active=True).order_by('-created_at')
+    categories_list = list(
+        Category.objects.annotate(
+            active_listings_count=Count('listings', filter=Q(listings__active=True)),
+            total_listings_count=Count('listings'),
+            recent_listing_id=Subquery(recent_active.values('pk')[:1])
+        ).order_by('name')
+    )
     
-    # Add listing counts and recent listings for each category
+    # Fetch the recent listings for all categories at once
+    recent_listings = Listing.objects.in_bulk(
+        [category.recent_listing_id for category in categories_list if category.recent_listing_id]
+    )
     for category in categories_list:
-        category.active_listings_count = Listing.objects.filter(category=category, active=True).count()
-        category.total_listings_count = Listing.objects.filter(category=category).count()
-        category.recent_listing = Listing.objects.filter(category=category, active=True).order_by('-created_at').first()
+        category.recent_listing = recent_listings.get(category.recent_listing_id)
+    
+    categories_with_active = [category for category in categories_list if category.active_listings_count]
+    most_active_category = max(categories_with_active, key=lambda category: category.active_listings_count, default=None)
     
     return render(request, "auctions/categories.html", {
-        "categories": categories_list
+        "categories": categories_list,
+        "categories_with_active": categories_with_active,
+        "most_active_category": most_active_category,
+        "total_active_listings": sum(category.active_listings_count for category in categories_list),
+        "total_listings": sum(category.total_listings_count for category in categories_list)
     })
 
 
 def category_listings(request, category_id):
     """Show listings filtered by category"""
     category = get_object_or_404(Category, id=category_id)
-    listings = Listing.objects.filter(category=category, active=True).order_by('-created_at')
+    listings = list(
+        Listing.objects.filter(category=category, active=True)
+        .select_related('creator')
+        .order_by('-created_at')
+    )
     
-    # Add watchlist status for authenticated users
-    if request.user.is_authenticated:
-        user_watchlist = set(Watchlist.objects.filter(user=request.user).values_list('listing_id', flat=True))
-        for listing in listings:
-            listing.is_watched = listing.id in user_watchlist
+    # Add watchlist status, answered from the user's cached watchlist
+    watched = watching.watched_ids(request.user, [listing.id for listing in listings])
+    for listing in listings:
+        listing.is_watched = listing.id in watched
     
     return render(request, "auctions/category_listings.html", {
         "category": category,
@@ -230,16 +479,13 @@ def place_bid(request, listing_id):
         if form.is_valid():
             bid_amount = form.cleaned_data['amount']
             
-            # Create the bid
-            bid = Bid.objects.create(
-                user=request.user,
-                listing=listing,
-                amount=bid_amount
-            )
-            
-            # Update listing's current price
-            listing.current_price = bid_amount
-            listing.save()
+            # The form checked a possibly stale price; the bid engine
+            # re-checks it atomically against concurrent bids
+            try:
+                bidding.place_bid(listing.id, request.user, bid_amount)
+            except bidding.BidRejected as e:
+                messages.error(request, str(e))
+                return redirect('listing_detail', listing_id=listing_id)
             
             messages.success(request, f"Your bid of ${bid_amount} has been placed successfully!")
         else:
@@ -287,13 +533,13 @@ def close_auction(request, listing_id):
         messages.info(request, "This auction is already closed.")
         return redirect('listing_detail', listing_id=listing_id)
     
-    # Close the listing
-    listing.active = False
-    listing.save()
+    # Close the listing, settling the winner unless the expiry worker got there first
+    expiry.close_listings(Listing.objects.filter(pk=listing.pk))
+    events.publish_listing(listing.id)
     
-    highest_bid = listing.get_highest_bid()
-    if highest_bid:
-        messages.success(request, f"Auction closed! The winner is {highest_bid.user.username} with a bid of ${highest_bid.amount}.")
+    listing = Listing.objects.select_related('winner').get(pk=listing.pk)
+    if listing.winner:
+        messages.success(request, f"Auction closed! The winner is {listing.winner.username} with a bid of ${listing.current_price}.")
     else:
         messages.success(request, "Auction closed with no bids.")
     
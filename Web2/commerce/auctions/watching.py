@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User, Watchlist
+
+
+# Seconds a cached watchlist is kept. A change moves the user to a new
+# watchlist_version, so superseded entries simply expire
+WATCHLIST_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(user):
+    return f"auctions:watchlist:{user.id}:{user.watchlist_version}"
+
+
+def watchlist_ids(user):
+    """
+    Return the frozenset of listing ids the user watches, loading it with
+    one query on a cache miss. The cache key includes the user's
+    watchlist_version, which the auth middleware has already loaded, so
+    a change made in any worker is seen everywhere without a query.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    key = _cache_key(user)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Watchlist.objects.filter(user=user).values_list('listing_id', flat=True))
+        cache.set(key, ids, WATCHLIST_CACHE_TIMEOUT)
+    return ids
+
+
+def watched_ids(user, listing_ids):
+    """Return the subset of listing_ids watched by the user"""
+    return watchlist_ids(user).intersection(listing_ids)
+
+
+def invalidate(user_id):
+    """Move the given user to a new watchlist version"""
+    User.objects.filter(pk=user_id).update(watchlist_version=F('watchlist_version') + 1)
+
+
+@receiver(post_save, sender=Watchlist)
+@receiver(post_delete, sender=Watchlist)
+def watchlist_changed(sender, instance, **kwargs):
+    invalidate(instance.user_id)
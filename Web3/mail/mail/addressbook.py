@@ -0,0 +1,80 @@
+import bisect
+
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import Message, User
+
+
+# Seconds a cached address book is kept. Sending mail moves everyone on
+# the message to a new address_book_version, so superseded entries expire
+ADDRESS_BOOK_TIMEOUT = 60 * 60
+
+
+def normalize(addresses):
+    """Return the addresses stripped, lowercased and deduplicated, in order"""
+    normalized = (address.strip().lower() for address in addresses)
+    return list(dict.fromkeys(address for address in normalized if address))
+
+
+def resolve(addresses):
+    """
+    Look up the users with the given normalized addresses in one query.
+    Returns the list of users and the list of addresses with no user.
+    """
+    users = {user.email: user for user in User.objects.filter(email__in=addresses)}
+    unknown = [address for address in addresses if address not in users]
+    return list(users.values()), unknown
+
+
+def _cache_key(user):
+    return f"mail:address_book:{user.id}:{user.address_book_version}"
+
+
+def address_book(user):
+    """
+    Return the sorted addresses the user has sent mail to or received
+    mail from. It is cached under the user's address_book_version, which
+    is loaded with request.user, so no worker serves a superseded book.
+    """
+    key = _cache_key(user)
+    addresses = cache.get(key)
+    if addresses is None:
+        # Two narrow queries, each walking one indexed foreign key, rather
+        # than one ORed filter that joins every user to both directions
+        sent_to = (
+            Message.recipients.through.objects
+            .filter(message__sender=user)
+            .values_list("user__email", flat=True)
+            .distinct()
+        )
+        received_from = (
+            Message.objects
+            .filter(recipients=user)
+            .values_list("sender__email", flat=True)
+            .distinct()
+        )
+        addresses = sorted(set(sent_to).union(received_from).difference({""}))
+        cache.set(key, addresses, ADDRESS_BOOK_TIMEOUT)
+    return addresses
+
+
+def complete(user, prefix, limit=10):
+    """Return up to limit address book entries starting with prefix"""
+    prefix = prefix.strip().lower()
+    if not prefix:
+        return []
+    addresses = address_book(user)
+    position = bisect.bisect_left(addresses, prefix)
+    matches = []
+    while position < len(addresses) and len(matches) < limit:
+        if not addresses[position].startswith(prefix):
+            break
+        matches.append(addresses[position])
+        position += 1
+    return matches
+
+
+def invalidate(user_ids):
+    """Move the given users to new address book versions in one UPDATE"""
+    User.objects.filter(pk__in=user_ids).update(address_book_version=F("address_book_version") + 1)
@@ -0,0 +1,56 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, setup_databases, setup_test_environment,
+    teardown_databases, teardown_test_environment,
+)
+
+from mail.models import User
+
+
+class Command(BaseCommand):
+    help = ("Benchmark sending an email to 1, 50 and 1,000 recipients. "
+            "Runs against a temporary test database, not the configured one.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, nargs="+", default=[1, 50, 1000])
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            sender = User.objects.create_user("sender@example.com", "sender@example.com", "password")
+            users = User.objects.bulk_create([
+                User(username=f"user{i}@example.com", email=f"user{i}@example.com")
+                for i in range(max(options["recipients"]))
+            ])
+            client = Client()
+            client.force_login(sender)
+
+            for count in options["recipients"]:
+                payload = json.dumps({
+                    "recipients": ", ".join(user.email for user in users[:count]),
+                    "subject": "Benchmark",
+                    "body": "Hello " * 200
+                })
+                timings = []
+                for _ in range(options["repeat"]):
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        response = client.post("/emails", payload, content_type="application/json")
+                        timings.append((time.perf_counter() - start) * 1000)
+                    if response.status_code != 201:
+                        raise RuntimeError(response.content.decode())
+                timings.sort()
+                self.stdout.write(
+                    f"{count:>5} recipients: median {timings[len(timings) // 2]:.1f} ms, "
+                    f"{len(queries)} queries"
+                )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
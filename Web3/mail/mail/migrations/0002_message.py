@@ -0,0 +1,98 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def split_messages(apps, schema_editor):
+    """
+    Move each existing email's content into its own Message and flag the
+    entry as sent and/or received by its owner.
+    """
+    Email = apps.get_model("mail", "Email")
+    Message = apps.get_model("mail", "Message")
+    Recipient = Message.recipients.through
+
+    emails = list(Email.objects.prefetch_related("recipients").order_by("pk"))
+    messages = Message.objects.bulk_create([
+        Message(
+            sender_id=email.sender_id,
+            subject=email.subject,
+            body=email.body,
+            timestamp=email.timestamp
+        )
+        for email in emails
+    ])
+
+    recipients = []
+    for email, message in zip(emails, messages):
+        recipient_ids = [user.id for user in email.recipients.all()]
+        recipients.extend(Recipient(message_id=message.id, user_id=user_id) for user_id in recipient_ids)
+        email.message_id = message.id
+        email.sent = email.user_id == email.sender_id
+        email.received = email.user_id in recipient_ids
+    Recipient.objects.bulk_create(recipients)
+    Email.objects.bulk_update(emails, ["message", "sent", "received"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mail', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Message',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('recipients', models.ManyToManyField(related_name='messages_received', to=settings.AUTH_USER_MODEL)),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='messages_sent', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='email',
+            name='message',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='mail.message'),
+        ),
+        migrations.AddField(
+            model_name='email',
+            name='sent',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='email',
+            name='received',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(split_messages, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='email',
+            name='recipients',
+        ),
+        migrations.RemoveField(
+            model_name='email',
+            name='sender',
+        ),
+        migrations.RemoveField(
+            model_name='email',
+            name='subject',
+        ),
+        migrations.RemoveField(
+            model_name='email',
+            name='body',
+        ),
+        migrations.AlterField(
+            model_name='email',
+            name='message',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='mail.message'),
+        ),
+        migrations.AlterField(
+            model_name='email',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:56
+
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def normalize_emails(apps, schema_editor):
+    User = apps.get_model("mail", "User")
+    User.objects.update(email=Lower("email"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mail', '0002_message'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(blank=True, db_index=True, max_length=254, verbose_name='email address'),
+        ),
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+    ]
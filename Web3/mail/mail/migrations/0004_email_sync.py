@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mail', '0003_user_email_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='email',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='email',
+            index=models.Index(fields=['user', 'archived', 'timestamp'], name='email_mailbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='email',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='email_sync_idx'),
+        ),
+    ]
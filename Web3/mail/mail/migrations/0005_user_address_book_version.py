@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mail', '0004_email_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='address_book_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,28 +1,104 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Substr
+from django.utils import timezone
+
+
+# Characters of the body included in mailbox listings
+PREVIEW_LENGTH = 100
 
 
 class User(AbstractUser):
-    pass
+    # Stored lowercased and indexed so recipients resolve in one query
+    email = models.EmailField("email address", blank=True, db_index=True)
+    # Bumped whenever the user sends or receives mail. It versions the
+    # cached address book, so every worker sees new correspondents
+    address_book_version = models.PositiveIntegerField(default=0)
 
+    def save(self, *args, **kwargs):
+        self.email = self.email.lower()
+        super().save(*args, **kwargs)
 
-class Email(models.Model):
-    user = models.ForeignKey("User", on_delete=models.CASCADE, related_name="emails")
-    sender = models.ForeignKey("User", on_delete=models.PROTECT, related_name="emails_sent")
-    recipients = models.ManyToManyField("User", related_name="emails_received")
+
+class Message(models.Model):
+    sender = models.ForeignKey("User", on_delete=models.PROTECT, related_name="messages_sent")
+    recipients = models.ManyToManyField("User", related_name="messages_received")
     subject = models.CharField(max_length=255)
     body = models.TextField(blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)
+
+
+class EmailQuerySet(models.QuerySet):
+
+    def summaries(self):
+        """
+        Load everything serialize_summary() needs in two queries: the
+        entries joined with their message and sender, with only the start
+        of each body, and the recipients of all the messages at once.
+        """
+        return (
+            self.select_related("message__sender")
+            .defer("message__body")
+            .annotate(preview=Substr("message__body", 1, PREVIEW_LENGTH + 1))
+            .prefetch_related(models.Prefetch(
+                "message__recipients", queryset=User.objects.only("email")
+            ))
+        )
+
+
+class Email(models.Model):
+    """
+    One user's mailbox entry for a message. The message itself is stored
+    once and shared by the entries of its sender and every recipient.
+    """
+    user = models.ForeignKey("User", on_delete=models.CASCADE, related_name="emails")
+    message = models.ForeignKey("Message", on_delete=models.CASCADE, related_name="entries")
+    sent = models.BooleanField(default=False)
+    received = models.BooleanField(default=False)
+    timestamp = models.DateTimeField(default=timezone.now)
     read = models.BooleanField(default=False)
     archived = models.BooleanField(default=False)
+    # Bumped on every change, so clients can sync read and archive flips
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EmailQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves mailbox listings, newest first
+            models.Index(fields=["user", "archived", "timestamp"], name="email_mailbox_idx"),
+            # Serves incremental sync
+            models.Index(fields=["user", "updated_at", "id"], name="email_sync_idx"),
+        ]
 
     def serialize(self):
+        message = self.message
+        return {
+            "id": self.id,
+            "sender": message.sender.email,
+            "recipients": [user.email for user in message.recipients.all()],
+            "subject": message.subject,
+            "body": message.body,
+            "timestamp": self.timestamp.strftime("%b %d %Y, %I:%M %p"),
+            "read": self.read,
+            "archived": self.archived
+        }
+
+    def serialize_summary(self):
+        """
+        Serialize for mailbox listings, with a preview in place of the
+        body. Expects the query from Email.objects.summaries().
+        """
+        message = self.message
+        preview = self.preview
+        if len(preview) > PREVIEW_LENGTH:
+            preview = preview[:PREVIEW_LENGTH].rstrip() + "…"
         return {
             "id": self.id,
-            "sender": self.sender.email,
-            "recipients": [user.email for user in self.recipients.all()],
-            "subject": self.subject,
-            "body": self.body,
+            "sender": message.sender.email,
+            "recipients": [user.email for user in message.recipients.all()],
+            "subject": message.subject,
+            "preview": preview,
             "timestamp": self.timestamp.strftime("%b %d %Y, %I:%M %p"),
             "read": self.read,
             "archived": self.archived
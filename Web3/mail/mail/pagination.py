@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+from django.db.models import Q
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+def encode_cursor(moment, pk):
+    """Encode a (timestamp, id) position as an opaque URL-safe cursor"""
+    return urlsafe_base64_encode(f"{moment.isoformat()}|{pk}".encode())
+
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor(), or return None if it is invalid"""
+    try:
+        moment, pk = urlsafe_base64_decode(cursor).decode().split("|")
+        return datetime.fromisoformat(moment), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def page(queryset, cursor=None, page_size=50):
+    """
+    Return one page of emails, newest first, and the cursor of the next
+    page (None on the last page). Pages seek past the last (timestamp, id)
+    seen rather than using OFFSET.
+    """
+    queryset = queryset.order_by("-timestamp", "-id")
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        timestamp, pk = position
+        queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk))
+    items = list(queryset[:page_size + 1])
+    if len(items) > page_size:
+        items = items[:page_size]
+        return items, encode_cursor(items[-1].timestamp, items[-1].pk)
+    return items, None
+
+
+def changes(queryset, since, limit=200):
+    """
+    Return up to limit emails changed after the (updated_at, id) position
+    of the since cursor, oldest change first, the cursor to sync from next
+    time and whether more changes remain.
+    """
+    queryset = queryset.order_by("updated_at", "id")
+    position = decode_cursor(since)
+    if position is not None:
+        updated_at, pk = position
+        queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+    items = list(queryset[:limit + 1])
+    more = len(items) > limit
+    items = items[:limit]
+    if items:
+        since = encode_cursor(items[-1].updated_at, items[-1].pk)
+    return items, since, more
+
+
+def sync_cursor(queryset):
+    """Return a since cursor positioned after the latest change in queryset"""
+    latest = queryset.order_by("-updated_at", "-id").values("updated_at", "id").first()
+    if latest is None:
+        return encode_cursor(datetime.fromtimestamp(0, timezone.utc), 0)
+    return encode_cursor(latest["updated_at"], latest["id"])
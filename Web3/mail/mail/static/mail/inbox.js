@@ -9,6 +9,9 @@ document.addEventListener('DOMContentLoaded', function() {
   // Add event listener to compose form
   document.querySelector('#compose-form').addEventListener('submit', send_email);
 
+  // Suggest addresses from the address book while typing recipients
+  document.querySelector('#compose-recipients').addEventListener('input', suggest_recipients);
+
   // By default, load the inbox
   load_mailbox('inbox');
 });
@@ -25,6 +28,41 @@ function compose_email() {
   document.querySelector('#compose-body').value = '';
 }
 
+// Cache of address book suggestions by prefix
+const contactSuggestions = {};
+
+function suggest_recipients() {
+  const input = document.querySelector('#compose-recipients');
+
+  // Complete only the address after the last comma
+  const separator = input.value.lastIndexOf(',');
+  const head = separator === -1 ? '' : input.value.slice(0, separator + 1) + ' ';
+  const prefix = input.value.slice(separator + 1).trim().toLowerCase();
+
+  const show = contacts => {
+    const datalist = document.querySelector('#compose-contacts');
+    datalist.innerHTML = '';
+    contacts.forEach(contact => {
+      const option = document.createElement('option');
+      option.value = head + contact;
+      datalist.appendChild(option);
+    });
+  };
+
+  if (!prefix) {
+    show([]);
+  } else if (contactSuggestions[prefix]) {
+    show(contactSuggestions[prefix]);
+  } else {
+    fetch(`/contacts?q=${encodeURIComponent(prefix)}`)
+    .then(response => response.json())
+    .then(result => {
+      contactSuggestions[prefix] = result.contacts;
+      show(result.contacts);
+    });
+  }
+}
+
 function send_email(event) {
   // Prevent default form submission
   event.preventDefault();
@@ -60,6 +98,14 @@ function send_email(event) {
   });
 }
 
+// Loaded emails of each mailbox, keyed by id, with the cursor of the next
+// page and the cursor to sync changes from
+const mailboxes = {};
+
+// How often the open mailbox is checked for changes
+const SYNC_INTERVAL = 30000;
+let syncTimer = null;
+
 function load_mailbox(mailbox) {
   // Set current mailbox
   currentMailbox = mailbox;
@@ -77,12 +123,37 @@ function load_mailbox(mailbox) {
   // Show the mailbox name
   document.querySelector('#emails-view').innerHTML = `<h3>${mailbox.charAt(0).toUpperCase() + mailbox.slice(1)}</h3>`;
 
-  // Fetch emails for this mailbox
-  fetch(`/emails/${mailbox}`)
+  // Emails already loaded are shown at once and brought up to date with
+  // an incremental sync rather than downloaded again
+  if (mailboxes[mailbox]) {
+    render_emails(mailbox);
+    sync_mailbox(mailbox);
+  } else {
+    load_page(mailbox);
+  }
+
+  // Keep polling the open mailbox for changes
+  if (syncTimer === null) {
+    syncTimer = setInterval(() => sync_mailbox(currentMailbox), SYNC_INTERVAL);
+  }
+}
+
+function load_page(mailbox) {
+  const state = mailboxes[mailbox];
+  const url = state ? `/emails/${mailbox}?cursor=${encodeURIComponent(state.next)}` : `/emails/${mailbox}`;
+
+  // Fetch the first page, or the next older page, of this mailbox
+  fetch(url)
   .then(response => response.json())
-  .then(emails => {
-    // Render emails in the mailbox
-    render_emails(emails, mailbox);
+  .then(result => {
+    if (!mailboxes[mailbox]) {
+      mailboxes[mailbox] = {emails: new Map(), next: null, since: result.since};
+    }
+    result.emails.forEach(email => mailboxes[mailbox].emails.set(email.id, email));
+    mailboxes[mailbox].next = result.next;
+    if (mailbox === currentMailbox) {
+      render_emails(mailbox);
+    }
   })
   .catch(error => {
     console.error('Error loading mailbox:', error);
@@ -90,17 +161,87 @@ function load_mailbox(mailbox) {
   });
 }
 
-function render_emails(emails, mailbox) {
+function belongs_in(mailbox, email) {
+  if (mailbox === 'inbox') {
+    return !email.archived;
+  } else if (mailbox === 'archive') {
+    return email.archived;
+  }
+  return true;
+}
+
+function sync_mailbox(mailbox) {
+  const state = mailboxes[mailbox];
+  if (!state) {
+    return;
+  }
+
+  // Fetch only the emails that are new or changed since the last sync
+  fetch(`/emails/${mailbox}?since=${encodeURIComponent(state.since)}`)
+  .then(response => response.json())
+  .then(result => {
+    // Emails older than the loaded pages arrive with those pages instead
+    const oldest = state.next ? Math.min(...state.emails.keys()) : 0;
+    result.emails.forEach(email => {
+      if (belongs_in(mailbox, email) && email.id > oldest) {
+        state.emails.set(email.id, email);
+      } else {
+        state.emails.delete(email.id);
+      }
+    });
+    state.since = result.since;
+
+    if (result.more) {
+      sync_mailbox(mailbox);
+    }
+
+    // Redraw if the mailbox changed while it is on screen
+    const emailsView = document.querySelector('#emails-view');
+    if (result.emails.length > 0 && mailbox === currentMailbox && emailsView.style.display !== 'none') {
+      render_emails(mailbox);
+    }
+  })
+  .catch(error => {
+    console.error('Error syncing mailbox:', error);
+  });
+}
+
+function render_emails(mailbox) {
   const emailsView = document.querySelector('#emails-view');
+  const state = mailboxes[mailbox];
+  const emails = [...state.emails.values()].sort((a, b) => b.id - a.id);
+
+  // Replace any previous rendering below the mailbox name
+  emailsView.querySelectorAll('.emails-list').forEach(element => element.remove());
   
   // If no emails, show message
   if (emails.length === 0) {
-    emailsView.innerHTML += '<p>No emails in this mailbox.</p>';
+    const empty = document.createElement('p');
+    empty.className = 'emails-list';
+    empty.textContent = 'No emails in this mailbox.';
+    emailsView.appendChild(empty);
     return;
   }
 
   // Create container for emails
   const emailsContainer = document.createElement('div');
+  emailsContainer.className = 'emails-list';
+  
+  // Actions applied to every selected email with one request
+  if (mailbox !== 'sent') {
+    const actions = document.createElement('div');
+    actions.className = 'mb-2';
+    const archived = mailbox === 'archive';
+    [['Mark as read', {read: true}], [archived ? 'Unarchive' : 'Archive', {archived: !archived}]]
+    .forEach(([label, flags]) => {
+      const button = document.createElement('button');
+      button.className = 'btn btn-sm btn-outline-secondary mr-2';
+      button.textContent = label;
+      button.addEventListener('click', () => update_selected(mailbox, flags));
+      actions.appendChild(button);
+    });
+    emailsContainer.appendChild(actions);
+  }
   
   // Render each email
   emails.forEach(email => {
@@ -124,10 +265,12 @@ function render_emails(emails, mailbox) {
     emailDiv.innerHTML = `
       <div class="row">
         <div class="col-md-3">
+          <input type="checkbox" class="email-select mr-2" value="${email.id}">
           <strong>${senderOrRecipient}</strong>
         </div>
         <div class="col-md-6">
           <span>${email.subject || '(No Subject)'}</span>
+          <small class="text-muted email-preview"></small>
         </div>
         <div class="col-md-3 text-right">
           <small class="text-muted">${timestamp}</small>
@@ -135,15 +278,59 @@ function render_emails(emails, mailbox) {
       </div>
     `;
     
+    // Show the start of the body beside the subject
+    if (email.preview) {
+      emailDiv.querySelector('.email-preview').textContent = ` - ${email.preview}`;
+    }
+    
+    // Selecting an email does not open it
+    emailDiv.querySelector('.email-select').addEventListener('click', event => event.stopPropagation());
+    
     // Add click event to view email details
     emailDiv.addEventListener('click', () => view_email(email.id));
     
     emailsContainer.appendChild(emailDiv);
   });
   
+  // Offer the next older page, if any
+  if (state.next) {
+    const more = document.createElement('button');
+    more.className = 'btn btn-sm btn-outline-secondary';
+    more.textContent = 'Load older emails';
+    more.addEventListener('click', () => {
+      more.disabled = true;
+      load_page(mailbox);
+    });
+    emailsContainer.appendChild(more);
+  }
+  
   emailsView.appendChild(emailsContainer);
 }
 
+function update_selected(mailbox, flags) {
+  const ids = [...document.querySelectorAll('.email-select:checked')].map(input => parseInt(input.value));
+  if (ids.length === 0) {
+    return;
+  }
+
+  // Apply the flags to all selected emails at once, then pick up the changes
+  fetch('/emails/bulk', {
+    method: 'PATCH',
+    body: JSON.stringify({ids: ids, ...flags})
+  })
+  .then(response => response.json())
+  .then(result => {
+    if (result.error) {
+      alert('Error: ' + result.error);
+    }
+    sync_mailbox(mailbox);
+  })
+  .catch(error => {
+    console.error('Error updating emails:', error);
+    alert('Error updating emails. Please try again.');
+  });
+}
+
 function view_email(email_id) {
   // Fetch individual email details
   fetch(`/emails/${email_id}`)
@@ -10,6 +10,8 @@ urlpatterns = [
 
     # API Routes
     path("emails", views.compose, name="compose"),
+    path("contacts", views.contacts, name="contacts"),
+    path("emails/bulk", views.bulk_update, name="bulk_update"),
     path("emails/<int:email_id>", views.email, name="email"),
     path("emails/<str:mailbox>", views.mailbox, name="mailbox"),
 ]
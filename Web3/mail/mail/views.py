@@ -1,13 +1,15 @@
 import json
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.http import JsonResponse
 from django.shortcuts import HttpResponse, HttpResponseRedirect, render
 from django.urls import reverse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 
-from .models import User, Email
+from . import addressbook, pagination
+from .models import User, Email, Message
 
 
 def index(request):
@@ -31,69 +33,142 @@ def compose(request):
 
     # Check recipient emails
     data = json.loads(request.body)
-    emails = [email.strip() for email in data.get("recipients").split(",")]
-    if emails == [""]:
+    emails = addressbook.normalize(data.get("recipients", "").split(","))
+    if not emails:
         return JsonResponse({
             "error": "At least one recipient required."
         }, status=400)
 
-    # Convert email addresses to users
-    recipients = []
-    for email in emails:
-        try:
-            user = User.objects.get(email=email)
-            recipients.append(user)
-        except User.DoesNotExist:
-            return JsonResponse({
-                "error": f"User with email {email} does not exist."
-            }, status=400)
+    # Convert email addresses to users, reporting every unknown address
+    recipients, unknown = addressbook.resolve(emails)
+    if unknown:
+        return JsonResponse({
+            "error": f"User with email {unknown[0]} does not exist." if len(unknown) == 1
+            else f"Users with emails {', '.join(unknown)} do not exist.",
+            "unknown": unknown
+        }, status=400)
 
     # Get contents of email
     subject = data.get("subject", "")
     body = data.get("body", "")
 
-    # Create one email for each recipient, plus sender
-    users = set()
-    users.add(request.user)
-    users.update(recipients)
-    for user in users:
-        email = Email(
-            user=user,
+    # Store the message once, then give the sender and each recipient a
+    # mailbox entry for it, all in one transaction
+    recipient_ids = {recipient.id for recipient in recipients}
+    with transaction.atomic():
+        message = Message.objects.create(
             sender=request.user,
             subject=subject,
-            body=body,
-            read=user == request.user
+            body=body
         )
-        email.save()
-        for recipient in recipients:
-            email.recipients.add(recipient)
-        email.save()
+        message.recipients.add(*recipient_ids)
+        Email.objects.bulk_create([
+            Email(
+                user_id=user_id,
+                message=message,
+                sent=user_id == request.user.id,
+                received=user_id in recipient_ids,
+                timestamp=message.timestamp,
+                read=user_id == request.user.id
+            )
+            for user_id in recipient_ids | {request.user.id}
+        ])
+        addressbook.invalidate(recipient_ids | {request.user.id})
 
     return JsonResponse({"message": "Email sent successfully."}, status=201)
 
 
+@login_required
+def contacts(request):
+
+    # Suggest addresses from the user's address book for compose
+    return JsonResponse({
+        "contacts": addressbook.complete(request.user, request.GET.get("q", ""))
+    })
+
+
+# Emails per mailbox page, and changes per incremental sync response
+MAILBOX_PAGE_SIZE = 50
+SYNC_LIMIT = 200
+
+
 @login_required
 def mailbox(request, mailbox):
 
-    # Filter emails returned based on mailbox
+    # Filter emails returned based on mailbox; the archived flag is left
+    # out of the base filter so incremental syncs also report archiving
     if mailbox == "inbox":
-        emails = Email.objects.filter(
-            user=request.user, recipients=request.user, archived=False
-        )
+        emails = Email.objects.filter(user=request.user, received=True)
+        listed = emails.filter(archived=False)
     elif mailbox == "sent":
-        emails = Email.objects.filter(
-            user=request.user, sender=request.user
-        )
+        emails = Email.objects.filter(user=request.user, sent=True)
+        listed = emails
     elif mailbox == "archive":
-        emails = Email.objects.filter(
-            user=request.user, recipients=request.user, archived=True
-        )
+        emails = Email.objects.filter(user=request.user, received=True)
+        listed = emails.filter(archived=True)
     else:
         return JsonResponse({"error": "Invalid mailbox."}, status=400)
 
-    # Return emails in reverse chronologial order
-    emails = emails.order_by("-timestamp").all()
-    return JsonResponse([email.serialize() for email in emails], safe=False)
+    # Return the emails changed since a sync cursor, oldest change first
+    if "since" in request.GET:
+        changed, since, more = pagination.changes(
+            emails.summaries(), request.GET["since"], limit=SYNC_LIMIT
+        )
+        return JsonResponse({
+            "emails": [email.serialize_summary() for email in changed],
+            "since": since,
+            "more": more
+        })
+
+    # Return a page of emails in reverse chronological order. The first
+    # page carries the cursor to sync from, taken before the page is read
+    # so no change in between is missed
+    cursor = request.GET.get("cursor")
+    since = None if cursor else pagination.sync_cursor(emails)
+    page, next_cursor = pagination.page(listed.summaries(), cursor, page_size=MAILBOX_PAGE_SIZE)
+    return JsonResponse({
+        "emails": [email.serialize_summary() for email in page],
+        "next": next_cursor,
+        "since": since
+    })
+
+
+# Most emails one bulk update may change
+BULK_UPDATE_LIMIT = 1000
+
+
+@csrf_exempt
+@login_required
+def bulk_update(request):
+
+    # Bulk updates must be via PATCH
+    if request.method != "PATCH":
+        return JsonResponse({"error": "PATCH request required."}, status=400)
+
+    # Check the ids and flags to apply
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict):
+        return JsonResponse({"error": "A JSON object is required."}, status=400)
+    ids = data.get("ids")
+    if (not isinstance(ids, list) or not ids
+            or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids)):
+        return JsonResponse({"error": "A list of email ids is required."}, status=400)
+    if len(ids) > BULK_UPDATE_LIMIT:
+        return JsonResponse({
+            "error": f"At most {BULK_UPDATE_LIMIT} emails can be updated at once."
+        }, status=400)
+    flags = {field: data[field] for field in ("read", "archived") if data.get(field) is not None}
+    if not flags or not all(isinstance(value, bool) for value in flags.values()):
+        return JsonResponse({"error": "read and/or archived must be true or false."}, status=400)
+
+    # Apply the flags with one UPDATE, limited to the user's own emails
+    updated = Email.objects.filter(user=request.user, id__in=ids).update(
+        updated_at=timezone.now(), **flags
+    )
+    return JsonResponse({"updated": updated})
 
 
 @csrf_exempt
@@ -102,7 +177,7 @@ def email(request, email_id):
 
     # Query for requested email
     try:
-        email = Email.objects.get(user=request.user, pk=email_id)
+        email = Email.objects.select_related("message__sender").get(user=request.user, pk=email_id)
     except Email.DoesNotExist:
         return JsonResponse({"error": "Email not found."}, status=404)
 
@@ -113,11 +188,14 @@ def email(request, email_id):
     # Update whether email is read or should be archived
     elif request.method == "PUT":
         data = json.loads(request.body)
+        fields = ["updated_at"]
         if data.get("read") is not None:
             email.read = data["read"]
+            fields.append("read")
         if data.get("archived") is not None:
             email.archived = data["archived"]
-        email.save()
+            fields.append("archived")
+        email.save(update_fields=fields)
         return HttpResponse(status=204)
 
     # Email must be via GET or PUT
@@ -167,7 +245,6 @@ def register(request):
         # Attempt to create new user
         try:
             user = User.objects.create_user(email, email, password)
-            user.save()
         except IntegrityError as e:
             print(e)
             return render(request, "mail/register.html", {